@@ -0,0 +1,56 @@
+"""Сравнение JSON-кодеков на типичных для сервиса данных: событие outbox и страница TaskList.
+
+Запуск: python -m benchmarks.bench_codec [repeat]
+"""
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+for name, value in {"DB_USER": "bench", "DB_PASSWORD": "bench", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "bench"}.items():
+    os.environ.setdefault(name, value)
+
+from src.core.codec import JSONCodec, OrjsonCodec, orjson  # noqa: E402
+
+
+def _task(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"task {i}",
+        "description": "benchmark task " * 4,
+        "priority": "MEDIUM",
+        "status": "PENDING",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    }
+
+
+PAYLOADS = {
+    "outbox_event": {"task_id": str(uuid.uuid4()), "payload": {"title": "task", "description": "x" * 64, "priority": "HIGH"}},
+    "task_list_20": {"items": [_task(i) for i in range(20)], "total": 1000, "page": 1, "page_size": 20},
+}
+
+
+def _bench(func, arg, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - started) * 1e6 / repeat
+
+
+def main(repeat: int = 20000):
+    codecs = [JSONCodec()] + ([OrjsonCodec()] if orjson is not None else [])
+    for payload_name, payload in PAYLOADS.items():
+        for codec in codecs:
+            raw = codec.dumps(payload)
+            dumps = _bench(codec.dumps, payload, repeat)
+            loads = _bench(codec.loads, raw, repeat)
+            print(f"{payload_name:14s} {codec.name:7s} {len(raw):6d}B  dumps {dumps:7.2f} us  loads {loads:7.2f} us")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
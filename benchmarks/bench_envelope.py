@@ -0,0 +1,46 @@
+"""Размер и стоимость разбора сообщения о задаче: JSON против бинарного конверта.
+
+decode меряется до готового UUID задачи - столько же работы делает BaseMessageHandler.
+
+Запуск: python -m benchmarks.bench_envelope [repeat]
+"""
+import os
+import sys
+import time
+import uuid
+
+for name, value in {"DB_USER": "bench", "DB_PASSWORD": "bench", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "bench"}.items():
+    os.environ.setdefault(name, value)
+
+from uuid import UUID  # noqa: E402
+
+from src.infra.mq.envelope import decode_message, encode_message  # noqa: E402
+
+PAYLOAD = {
+    "task_id": str(uuid.uuid4()),
+    "payload": {"title": "Обработать отчет", "description": "x" * 64, "priority": "HIGH"},
+}
+
+
+def _bench(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1e6 / repeat
+
+
+def _task_id(body: bytes, content_type: str) -> UUID:
+    task_id = decode_message(body, content_type)["task_id"]
+    return task_id if isinstance(task_id, UUID) else UUID(task_id)
+
+
+def main(repeat: int = 100000):
+    for fmt in ("json", "binary"):
+        body, content_type, _ = encode_message(PAYLOAD, "task.created", fmt=fmt)
+        encode = _bench(lambda: encode_message(PAYLOAD, "task.created", fmt=fmt), repeat)
+        decode = _bench(lambda: _task_id(body, content_type), repeat)
+        print(f"{fmt:7s} {len(body):4d}B  encode {encode:6.2f} us  decode {decode:6.2f} us")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,57 @@
+"""Пропускная способность публикации с подтверждениями: по одному сообщению против пула каналов.
+
+Нужен живой RabbitMQ (RABBITMQ_URL). Сообщения уходят во временную очередь, которая удаляется в конце.
+Запуск: python -m benchmarks.bench_publisher [messages]
+"""
+import asyncio
+import os
+import sys
+import time
+
+for name, value in {"DB_USER": "bench", "DB_PASSWORD": "bench", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "bench"}.items():
+    os.environ.setdefault(name, value)
+
+import aio_pika  # noqa: E402
+
+from src.core.settings import settings  # noqa: E402
+from src.infra.mq.publisher import PublisherPool  # noqa: E402
+
+BODY = b"\x01" + bytes(18)
+
+
+async def sequential(connection, queue_name: str, count: int) -> float:
+    channel = await connection.channel(publisher_confirms=True)
+    started = time.perf_counter()
+    for _ in range(count):
+        await channel.default_exchange.publish(aio_pika.Message(BODY), routing_key=queue_name)
+    elapsed = time.perf_counter() - started
+    await channel.close()
+    return count / elapsed
+
+
+async def pooled(connection, queue_name: str, count: int) -> float:
+    async def factory():
+        return connection
+
+    pool = PublisherPool(factory)
+    started = time.perf_counter()
+    await pool.publish_many([(aio_pika.Message(BODY), queue_name) for _ in range(count)])
+    elapsed = time.perf_counter() - started
+    await pool.close()
+    return count / elapsed
+
+
+async def main(count: int = 20000):
+    connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+    channel = await connection.channel()
+    queue = await channel.declare_queue("bench_publisher", auto_delete=True)
+    try:
+        print(f"sequential confirms: {await sequential(connection, queue.name, count):10.0f} msg/s")
+        print(f"publisher pool:      {await pooled(connection, queue.name, count):10.0f} msg/s")
+    finally:
+        await queue.delete(if_unused=False, if_empty=False)
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,88 @@
+"""Стоимость построения и компиляции запросов TaskRepository на запрос.
+
+Сравниваются: запрос, собираемый заново без кэша компиляции (как при query_cache_size=0),
+тот же запрос с кэшем SQLAlchemy и заранее построенные запросы репозитория.
+Запуск: python -m benchmarks.bench_statement_cache [repeat]
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+for name, value in {"DB_USER": "bench", "DB_PASSWORD": "bench", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "bench"}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from src.models.tasks import Task, Priority, Status  # noqa: E402
+from src.repositories.task_repository import TASK_READ_COLUMNS, TaskRepository  # noqa: E402
+
+
+class _SyncSession:
+    """Минимальный адаптер: методы репозитория вызывают await db.execute(...)."""
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    async def execute(self, stmt, params=None):
+        return self._session.execute(stmt, params)
+
+
+def _engine(query_cache_size: int):
+    engine = create_engine("sqlite://", query_cache_size=query_cache_size)
+    Task.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {
+                "id": uuid.uuid4(),
+                "title": f"task {i}",
+                "priority": Priority.HIGH,
+                "status": Status.PENDING,
+                "created_at": datetime.now(timezone.utc),
+            }
+            for i in range(50)
+        ])
+    return engine
+
+
+async def adhoc_request(db: _SyncSession, task_id: uuid.UUID):
+    await db.execute(select(*TASK_READ_COLUMNS).where(Task.id == task_id))
+    stmt = select(*TASK_READ_COLUMNS).where(Task.priority == "HIGH", Task.status == "PENDING")
+    stmt = stmt.order_by(Task.created_at.desc(), Task.id.desc()).offset(0).limit(20)
+    await db.execute(stmt)
+
+
+async def repository_request(db: _SyncSession, task_id: uuid.UUID):
+    repo = TaskRepository()
+    await repo.get_task_row(db, task_id)
+    await repo.list_tasks(db, limit=20, priority="HIGH", status="PENDING", with_total=False)
+
+
+async def _bench(request, query_cache_size: int, repeat: int) -> float:
+    engine = _engine(query_cache_size)
+    with Session(engine) as session:
+        db = _SyncSession(session)
+        task_id = session.execute(select(Task.id).limit(1)).scalar_one()
+        await request(db, task_id)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await request(db, task_id)
+        return (time.perf_counter() - started) * 1e6 / repeat
+
+
+async def main(repeat: int = 3000):
+    cases = [
+        ("ad-hoc, no compiled cache", adhoc_request, 0),
+        ("ad-hoc, compiled cache", adhoc_request, 1200),
+        ("repository (prebuilt)", repository_request, 1200),
+    ]
+    for label, request, cache_size in cases:
+        elapsed = await _bench(request, cache_size, repeat)
+        print(f"{label:30s} {elapsed:8.1f} us/request (get + list)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
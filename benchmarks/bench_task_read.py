@@ -0,0 +1,77 @@
+"""Сравнение путей чтения задач: ORM + model_validate против Core mappings + model_construct.
+
+Запуск: python -m benchmarks.bench_task_read [rows] [repeat]
+Используется in-memory sqlite, поэтому цифры показывают только CPU на стороне Python.
+"""
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Настройки требуют параметры БД, хотя сам бенчмарк к Postgres не подключается.
+for name, value in {"DB_USER": "bench", "DB_PASSWORD": "bench", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "bench"}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from src.models.tasks import Task, Priority, Status  # noqa: E402
+from src.repositories.task_repository import TASK_READ_COLUMNS  # noqa: E402
+from src.schemas.tasks_schemas import TaskRead  # noqa: E402
+
+
+def _setup(rows: int):
+    engine = create_engine("sqlite://")
+    Task.__table__.create(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {
+                "id": uuid.uuid4(),
+                "title": f"task {i}",
+                "description": "benchmark task",
+                "priority": Priority.MEDIUM,
+                "status": Status.PENDING,
+                "created_at": now,
+            }
+            for i in range(rows)
+        ])
+    return engine
+
+
+def read_orm(engine) -> list[TaskRead]:
+    with Session(engine) as session:
+        tasks = session.execute(select(Task)).scalars().all()
+        return [TaskRead.model_validate(task) for task in tasks]
+
+
+def read_core(engine) -> list[TaskRead]:
+    with engine.connect() as conn:
+        rows = conn.execute(select(*TASK_READ_COLUMNS)).mappings().all()
+        return [TaskRead.model_construct(**row) for row in rows]
+
+
+def _best(func, engine, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(engine)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(rows: int = 20000, repeat: int = 5):
+    engine = _setup(rows)
+    assert [t.id for t in read_orm(engine)] == [t.id for t in read_core(engine)]
+
+    orm = _best(read_orm, engine, repeat)
+    core = _best(read_core, engine, repeat)
+    print(f"rows={rows}")
+    print(f"orm + model_validate:    {orm * 1e6 / rows:8.2f} us/row")
+    print(f"core + model_construct:  {core * 1e6 / rows:8.2f} us/row")
+    print(f"speedup: {orm / core:.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
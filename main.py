@@ -1,16 +1,42 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from src.api.v1.endpoints.tasks import router as v1_router
+from src.api.v1.endpoints.metrics import router as metrics_router
 from src.core.logging import get_logger
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.core.register_error import register_error_handlers
+from src.core.responses import CodecJSONResponse
+from src.infra.cache.task_cache import get_task_cache
+from src.infra.notifications.hub import TaskEventsListener, get_notification_hub
 
 get_logger("Main")
 
-app = FastAPI(title="Async Task Service", version="1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = asyncio.create_task(TaskEventsListener(get_notification_hub(), get_task_cache()).run())
+    try:
+        yield
+    finally:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+
+
+app = FastAPI(
+    title="Async Task Service",
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=CodecJSONResponse,
+)
 register_error_handlers(app)
 app.include_router(v1_router, prefix="/api/v1")
+app.include_router(metrics_router, prefix="/api/v1")
 
 app.add_middleware(
     CORSMiddleware,
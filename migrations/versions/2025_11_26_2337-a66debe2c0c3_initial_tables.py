@@ -5,10 +5,14 @@ Revises: 4f7915bf1804
 Create Date: 2025-11-26 23:37:38.645922
 
 """
+from datetime import datetime, timedelta, timezone
 from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.core.settings import settings
 
 
 # revision identifiers, used by Alembic.
@@ -17,12 +21,69 @@ down_revision: Union[str, Sequence[str], None] = '4f7915bf1804'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+OUTBOX_PARTITIONS_AHEAD = 3
+# Модуль индекса берется из той же настройки, что и outbox_partition_expr; при ее смене
+# relay не стартует, пока индекс не пересоздан (см. check_partition_index).
+OUTBOX_HASH_PARTITIONS = settings.OUTBOX_PARTITIONS
+
 
 def upgrade() -> None:
     """Upgrade schema."""
-    pass
+    priority = postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', name='priority')
+    status = postgresql.ENUM('NEW', 'PENDING', 'IN_PROGRESS', 'COMPLETED', 'FAILED', 'CANCELLED', name='status')
+
+    op.create_table(
+        'tasks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('priority', priority, nullable=False),
+        sa.Column('status', status, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_tasks_status', 'tasks', ['status'])
+
+    op.execute(
+        """
+        CREATE TABLE outbox (
+            id uuid NOT NULL,
+            aggregate_type varchar(50) NOT NULL,
+            aggregate_id uuid NOT NULL,
+            event_type varchar(100) NOT NULL,
+            payload json NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            sent boolean NOT NULL DEFAULT false,
+            sent_at timestamptz,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE TABLE outbox_default PARTITION OF outbox DEFAULT")
+
+    # Партиции нарезаны по суткам UTC.
+    today = datetime.now(timezone.utc).date()
+    for offset in range(-1, OUTBOX_PARTITIONS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE outbox_p{day:%Y%m%d} PARTITION OF outbox "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+        )
+
+    op.execute("CREATE INDEX ix_outbox_unsent ON outbox (created_at) WHERE NOT sent")
+    op.execute(
+        "CREATE INDEX ix_outbox_unsent_partition ON outbox "
+        f"(((hashtext(aggregate_id::text) & 2147483647) % {OUTBOX_HASH_PARTITIONS}), created_at) WHERE NOT sent"
+    )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    pass
+    op.execute("DROP TABLE IF EXISTS outbox CASCADE")
+    op.drop_index('ix_tasks_status', table_name='tasks')
+    op.drop_table('tasks')
+    op.execute("DROP TYPE IF EXISTS status")
+    op.execute("DROP TYPE IF EXISTS priority")
@@ -0,0 +1,38 @@
+"""tasks keyset indexes
+
+Revision ID: 5b2e8c1d9f40
+Revises: a66debe2c0c3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c1d9f40'
+down_revision: Union[str, Sequence[str], None] = 'a66debe2c0c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_tasks_created_id': ['created_at', 'id'],
+    'ix_tasks_status_created_id': ['status', 'created_at', 'id'],
+    'ix_tasks_priority_created_id': ['priority', 'created_at', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'tasks', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='tasks', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,38 @@
+"""task counters
+
+Revision ID: 8d4a6f2b7c11
+Revises: 5b2e8c1d9f40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4a6f2b7c11'
+down_revision: Union[str, Sequence[str], None] = '5b2e8c1d9f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_counters',
+        sa.Column('status', postgresql.ENUM(name='status', create_type=False), primary_key=True),
+        sa.Column('priority', postgresql.ENUM(name='priority', create_type=False), primary_key=True),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        "INSERT INTO task_counters (status, priority, count) "
+        "SELECT status, priority, count(*) FROM tasks GROUP BY status, priority"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_counters')
@@ -0,0 +1,35 @@
+"""processed messages
+
+Revision ID: c3e9a7d41b52
+Revises: 8d4a6f2b7c11
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e9a7d41b52'
+down_revision: Union[str, Sequence[str], None] = '8d4a6f2b7c11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'processed_messages',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    )
+    op.create_index('ix_processed_messages_processed_at', 'processed_messages', ['processed_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_processed_messages_processed_at', table_name='processed_messages')
+    op.drop_table('processed_messages')
@@ -0,0 +1,29 @@
+"""task type
+
+Revision ID: e71f5a0c9d28
+Revises: c3e9a7d41b52
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e71f5a0c9d28'
+down_revision: Union[str, Sequence[str], None] = 'c3e9a7d41b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Константный DEFAULT не переписывает таблицу (PostgreSQL 11+).
+    op.add_column('tasks', sa.Column('type', sa.String(length=50), server_default='default', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'type')
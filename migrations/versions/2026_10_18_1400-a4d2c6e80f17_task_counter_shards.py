@@ -0,0 +1,38 @@
+"""task counter shards
+
+Revision ID: a4d2c6e80f17
+Revises: e71f5a0c9d28
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2c6e80f17'
+down_revision: Union[str, Sequence[str], None] = 'e71f5a0c9d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task_counters', sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('task_counters_pkey', 'task_counters', type_='primary')
+    op.create_primary_key('task_counters_pkey', 'task_counters', ['status', 'priority', 'shard'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "WITH moved AS (DELETE FROM task_counters WHERE shard <> 0 RETURNING status, priority, count) "
+        "INSERT INTO task_counters (status, priority, shard, count) "
+        "SELECT status, priority, 0, sum(count) FROM moved GROUP BY status, priority "
+        "ON CONFLICT (status, priority, shard) DO UPDATE SET count = task_counters.count + excluded.count"
+    )
+    op.drop_constraint('task_counters_pkey', 'task_counters', type_='primary')
+    op.drop_column('task_counters', 'shard')
+    op.create_primary_key('task_counters_pkey', 'task_counters', ['status', 'priority'])
@@ -1,31 +1,72 @@
+import argparse
 import asyncio
+import signal
 import sys
 import logging
 
 from src.dependencies.service import get_task_service
 from src.infra.tasks.worker import BaseWorker
+from src.infra.tasks.dedup import ProcessedMessageStore
 from src.infra.tasks.handler import BaseMessageHandler
+from src.infra.tasks.status_writer import StatusBatchWriter
+from src.infra.tasks.supervisor import WorkerSupervisor
 from src.infra.mq.client import MessageQueueClientAsync
+from src.core.database import configure_database
 from src.core.settings import settings
 from src.services.outbox_publisher import start_outbox_publisher
+from src.services.outbox_retention import start_outbox_retention
 
 logger = logging.getLogger("worker")
 
+WORKER_COMMANDS = ("worker", "worker_low", "worker_high", "worker_pool", "worker_fair")
 
-async def start_worker(queue_name: str):
+
+def _install_shutdown_handlers(worker: BaseWorker):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda: asyncio.create_task(worker.shutdown()))
+
+
+async def _build_worker() -> BaseWorker:
     mq = MessageQueueClientAsync.get_instance()
     await mq.configure()
     task_service = await get_task_service()
-    handler = BaseMessageHandler(logger=logger, task_service=task_service)
+    status_writer = StatusBatchWriter(task_service, logger) if settings.STATUS_BATCH_ENABLED else None
+    dedup = ProcessedMessageStore(logger) if settings.DEDUP_ENABLED else None
+    handler = BaseMessageHandler(logger=logger, task_service=task_service, status_writer=status_writer, dedup=dedup)
     worker = BaseWorker(mq_client=mq, handler=handler, logger=logger)
+    _install_shutdown_handlers(worker)
+    return worker
+
+
+async def start_worker(queue_name: str):
+    worker = await _build_worker()
     await worker.run(queue_name)
 
 
-async def main():
-    if len(sys.argv) < 2:
-        sys.exit(1)
+async def start_worker_pool(queue_names: list[str]):
+    worker = await _build_worker()
+    await worker.run_pool(queue_names)
+
+
+async def start_worker_fair(queue_names: list[str]):
+    worker = await _build_worker()
+    await worker.run_fair(queue_names)
 
-    cmd = sys.argv[1]
+
+COMMAND_ROLES = {
+    "worker": "worker",
+    "worker_low": "worker",
+    "worker_high": "worker",
+    "worker_pool": "worker",
+    "worker_fair": "worker",
+    "worker_outbox": "outbox",
+    "outbox_retention": "maintenance",
+}
+
+
+async def main(cmd: str):
+    configure_database(COMMAND_ROLES.get(cmd, "api"))
 
     if cmd == "worker":
         await start_worker(settings.QUEUE_MEDIUM)
@@ -36,16 +77,38 @@ async def main():
     elif cmd == "worker_high":
         await start_worker(settings.QUEUE_HIGH)
 
+    elif cmd == "worker_pool":
+        await start_worker_pool([settings.QUEUE_HIGH, settings.QUEUE_MEDIUM, settings.QUEUE_LOW])
+
+    elif cmd == "worker_fair":
+        await start_worker_fair([settings.QUEUE_HIGH, settings.QUEUE_MEDIUM, settings.QUEUE_LOW])
+
     elif cmd == "worker_outbox":
         await start_outbox_publisher()
 
+    elif cmd == "outbox_retention":
+        await start_outbox_retention()
+
     else:
         print(f"Unknown command: {cmd}")
         sys.exit(1)
 
 
+def run_worker_process(cmd: str):
+    asyncio.run(main(cmd))
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("cmd")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.processes > 1 and args.cmd in WORKER_COMMANDS:
+        WorkerSupervisor(run_worker_process, (args.cmd,), args.processes, logger).run()
+        sys.exit(0)
+
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.cmd))
     except KeyboardInterrupt:
         print("Worker stopped")
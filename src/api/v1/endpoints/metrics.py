@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from src.core.metrics import metrics
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+@router.get("")
+async def get_metrics():
+    return metrics.snapshot()
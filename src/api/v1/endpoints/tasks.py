@@ -1,9 +1,30 @@
+import asyncio
 from typing import Optional
-from fastapi import APIRouter, Depends
-from src.schemas.tasks_schemas import TaskCreate, TaskRead, TaskList, DeleteTaskResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from src.schemas.tasks_schemas import (
+    TaskCreate,
+    TaskRead,
+    TaskList,
+    DeleteTaskResponse,
+    TotalMode,
+    TaskBatchCreate,
+    TaskBatchItemResult,
+    TaskBatchResult,
+    TaskImport,
+    TaskImportError,
+    TaskImportResult,
+)
+from src.core import codec
+from src.core.ndjson import dumps_line, iter_lines
 from uuid import UUID
 from src.services.task_service import TaskService
 from src.dependencies.service import get_task_service
+from src.core.pagination import encode_cursor, decode_cursor
+from src.core.settings import settings
+from src.infra.notifications.hub import TaskNotificationHub, get_notification_hub
+from src.models.tasks import TERMINAL_STATUSES
 
 router = APIRouter(
     prefix="/tasks",
@@ -18,23 +39,152 @@ async def create_task(
     task = await service.create_task(payload)
     return task
 
+@router.post("/batch", response_model=TaskBatchResult, status_code=201)
+async def create_tasks_batch(
+    payload: TaskBatchCreate,
+    service: TaskService = Depends(get_task_service),
+):
+    results: list[Optional[TaskBatchItemResult]] = [None] * len(payload.items)
+    valid: list[tuple[int, TaskCreate]] = []
+    for index, item in enumerate(payload.items):
+        try:
+            valid.append((index, TaskCreate.model_validate(item)))
+        except ValidationError as e:
+            results[index] = TaskBatchItemResult(index=index, created=False, error=str(e))
+
+    tasks = await service.create_tasks([task for _, task in valid])
+    for (index, _), task in zip(valid, tasks):
+        results[index] = TaskBatchItemResult(index=index, created=True, task=TaskRead.model_validate(task))
+
+    return TaskBatchResult(created=len(tasks), failed=len(payload.items) - len(tasks), items=results)
+
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    service: TaskService = Depends(get_task_service),
+):
+    imported = 0
+    received = 0
+    errors: list[TaskImportError] = []
+    chunk: list[TaskImport] = []
+    # Тело читается по мере вставки пачек: пока ждем БД, новые байты из сокета не читаются.
+    async for line_no, line in iter_lines(request.stream()):
+        try:
+            chunk.append(TaskImport.model_validate_json(line))
+        except ValidationError as e:
+            errors.append(TaskImportError(line=line_no, error=str(e)))
+            continue
+        if len(chunk) >= settings.TASK_IMPORT_CHUNK_SIZE:
+            received += len(chunk)
+            imported += await service.import_tasks(chunk)
+            chunk = []
+    if chunk:
+        received += len(chunk)
+        imported += await service.import_tasks(chunk)
+
+    return TaskImportResult(
+        imported=imported,
+        skipped=received - imported,
+        failed=len(errors),
+        errors=errors[:100],
+    )
+
 @router.get("", response_model=TaskList)
 async def list_tasks(
     page: int = 1,
     page_size: int = 20,
     priority: Optional[str] = None,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = TotalMode.EXACT,
     service: TaskService = Depends(get_task_service)
 ):
-    tasks, total = await service.list_tasks(page=page, page_size=page_size, priority=priority, status=status)
+    decoded_cursor = decode_cursor(cursor) if cursor else None
+    tasks, total = await service.list_tasks(
+        page=page,
+        page_size=page_size,
+        priority=priority,
+        status=status,
+        cursor=decoded_cursor,
+        total_mode=total_mode,
+    )
+
+    next_cursor = None
+    if tasks and len(tasks) == page_size:
+        next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
 
+    # При выключенных счетчиках режим counter отдает оценку.
+    estimated = total_mode == TotalMode.ESTIMATE or (
+        total_mode == TotalMode.COUNTER and not settings.TASK_COUNTERS_ENABLED
+    )
     return TaskList(
-        items=[TaskRead.model_validate(task) for task in tasks],
+        items=tasks,
         total=total,
+        total_estimated=estimated,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor,
+    )
+
+@router.get("/export")
+async def export_tasks(
+    priority: Optional[str] = None,
+    status: Optional[str] = None,
+    service: TaskService = Depends(get_task_service),
+):
+    async def stream():
+        async for rows in service.export_tasks(
+            priority=priority, status=status, batch_size=settings.TASK_EXPORT_BATCH_SIZE
+        ):
+            yield b"".join(dumps_line(dict(row)) for row in rows)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/events")
+async def task_events(
+        request: Request,
+        task_id: Optional[UUID] = None,
+        hub: TaskNotificationHub = Depends(get_notification_hub),
+):
+    async def stream():
+        with hub.subscribe() as queue:
+            while not await request.is_disconnected():
+                try:
+                    event_task_id, status = await asyncio.wait_for(queue.get(), settings.SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Комментарий держит соединение открытым через прокси.
+                    yield ": keepalive\n\n"
+                    continue
+                if task_id is not None and event_task_id != task_id:
+                    continue
+                data = codec.dumps_str({"task_id": event_task_id, "status": status})
+                yield f"event: status\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+@router.get("/{task_id}/wait", response_model=TaskRead)
+async def wait_task(
+        task_id: UUID,
+        timeout: float = Query(30.0, ge=0),
+        service: TaskService = Depends(get_task_service),
+        hub: TaskNotificationHub = Depends(get_notification_hub),
+):
+    # Подписываемся до первого чтения, чтобы не пропустить завершение между чтением и ожиданием.
+    with hub.watch(task_id) as finished:
+        task = await service.get_task(task_id)
+        if task.status in TERMINAL_STATUSES:
+            return task
+        try:
+            await asyncio.wait_for(finished.wait(), min(timeout, settings.TASK_WAIT_MAX_TIMEOUT))
+        except asyncio.TimeoutError:
+            # Уведомление могло потеряться при переподключении LISTEN - перечитываем из основной БД.
+            pass
+    return await service.get_task(task_id, use_cache=False)
+
 @router.get("/{task_id}", response_model=TaskRead)
 async def get_task(
         task_id: UUID,
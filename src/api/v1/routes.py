@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
 from src.api.v1.endpoints.tasks import router as tasks_router
+from src.api.v1.endpoints.metrics import router as metrics_router
 
 routers = APIRouter()
 router_list = [
-    tasks_router
+    tasks_router,
+    metrics_router,
 ]
 
 for router in router_list:
@@ -0,0 +1,68 @@
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Union
+from uuid import UUID
+
+from src.core.settings import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONCodec:
+    """Stdlib-реализация; поддерживает те же типы, что и orjson: datetime, UUID, Enum."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+    def dumps_str(self, obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    def dumps_str(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=_default).decode()
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        return orjson.loads(data)
+
+
+def get_codec(name: str = settings.JSON_CODEC) -> JSONCodec:
+    if name == "orjson" or (name == "auto" and orjson is not None):
+        if orjson is None:
+            raise RuntimeError("JSON_CODEC=orjson, но пакет orjson не установлен")
+        return OrjsonCodec()
+    if name in ("json", "auto"):
+        return JSONCodec()
+    raise ValueError(f"Неизвестный JSON_CODEC: {name}")
+
+
+codec = get_codec()
+dumps = codec.dumps
+dumps_str = codec.dumps_str
+loads = codec.loads
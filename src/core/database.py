@@ -1,20 +1,101 @@
+import time
+import uuid
 from contextlib import asynccontextmanager
+from typing import Optional
+
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from src.core import codec
+from src.core.metrics import metrics
 from src.core.settings import settings
 
 load_dotenv()
 
 DATABASE_URL = f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+# Соединения LISTEN и advisory-локов живут дольше транзакции, поэтому идут в Postgres мимо PgBouncer.
+ASYNCPG_DSN = (
+    f"postgresql://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_DIRECT_HOST or settings.DB_HOST}:"
+    f"{settings.DB_DIRECT_PORT or settings.DB_PORT}/{settings.DB_NAME}"
+)
+REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_REPLICA_HOST}:"
+    f"{settings.DB_REPLICA_PORT or settings.DB_PORT}/{settings.DB_NAME}"
+    if settings.DB_REPLICA_HOST else None
+)
 
 Base: DeclarativeMeta = declarative_base()
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+pool_wait_seconds = metrics.histogram("db.pool.wait_seconds")
+
+
+def _instrument_pool(engine: AsyncEngine, name: str):
+    pool = engine.sync_engine.pool
+    checked_out = metrics.gauge(f"db.pool.{name}.checked_out")
+    overflow = metrics.gauge(f"db.pool.{name}.overflow")
+    metrics.gauge(f"db.pool.{name}.size").set(pool.size())
+
+    def _update(*_):
+        checked_out.set(pool.checkedout())
+        overflow.set(max(pool.overflow(), 0))
+
+    event.listen(engine.sync_engine, "checkout", _update)
+    event.listen(engine.sync_engine, "checkin", _update)
+
+
+def _connect_args(name: str) -> dict:
+    args = {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"application_name": f"task_service_{name}"},
+    }
+    if settings.DB_PGBOUNCER:
+        args.update(
+            prepared_statement_cache_size=0,
+            statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__",
+        )
+    return args
+
+
+def create_engine_for_role(role: str, url: str = DATABASE_URL, name: Optional[str] = None) -> AsyncEngine:
+    """Движок с пулом под конкретную роль процесса: api, worker, outbox, maintenance."""
+    name = name or role
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZES.get(role, settings.DB_POOL_SIZE),
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        json_serializer=codec.dumps_str,
+        json_deserializer=codec.loads,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=_connect_args(name),
+    )
+    _instrument_pool(engine, name)
+    return engine
+
+
+engine = create_engine_for_role("api")
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = create_engine_for_role("api", REPLICA_DATABASE_URL, "api_replica") if REPLICA_DATABASE_URL else None
+# Чтения, которым допустимо небольшое отставание; без реплики идут в основную БД.
+read_session_maker = sessionmaker(replica_engine or engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def configure_database(role: str):
+    """Пересоздает движки с пулом для роли процесса; вызывать до первого обращения к БД."""
+    global engine, replica_engine
+    engine = create_engine_for_role(role)
+    async_session_maker.configure(bind=engine)
+    replica_engine = create_engine_for_role(role, REPLICA_DATABASE_URL, f"{role}_replica") if REPLICA_DATABASE_URL else None
+    read_session_maker.configure(bind=replica_engine or engine)
+
 
 @asynccontextmanager
 async def get_db():
@@ -24,3 +105,9 @@ async def get_db():
         finally:
             await session.close()
 
+
+async def acquire_connection(session: AsyncSession):
+    """Берет соединение из пула сразу, чтобы время ожидания попало в метрику."""
+    started = time.perf_counter()
+    await session.connection()
+    pool_wait_seconds.observe(time.perf_counter() - started)
@@ -0,0 +1,24 @@
+from typing import Any, AsyncIterator
+
+from src.core import codec
+
+
+def dumps_line(obj: Any) -> bytes:
+    return codec.dumps(obj) + b"\n"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = 1 << 20) -> AsyncIterator[tuple[int, bytes]]:
+    """Режет поток байт на строки NDJSON, не собирая тело целиком; пустые строки пропускаются."""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Строка {line_no + 1} длиннее {max_line_bytes} байт")
+    if buffer.strip():
+        yield line_no + 1, buffer
@@ -0,0 +1,12 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.core import codec
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse, сериализующий через общий codec (orjson, если установлен)."""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
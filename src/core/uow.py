@@ -1,17 +1,32 @@
-from src.core.database import async_session_maker
+from contextvars import ContextVar
+
+from src.core.database import async_session_maker, acquire_connection
 
 class UnitOfWork:
     def __init__(self, session_factory=async_session_maker):
         self._session_factory = session_factory
+        # Сессия хранится в контексте задачи: один UnitOfWork могут одновременно использовать
+        # несколько корутин воркера, и у каждой должна быть своя транзакция.
+        self._db: ContextVar = ContextVar(f"uow_db_{id(self)}", default=None)
+
+    @property
+    def db(self):
+        return self._db.get()
 
     async def __aenter__(self):
-        self.db = self._session_factory()
-        await self.db.begin()
+        db = self._session_factory()
+        await db.begin()
+        self._db.set(db)
+        await acquire_connection(db)
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if exc:
-            await self.db.rollback()
-        else:
-            await self.db.commit()
-        await self.db.close()
+        db = self._db.get()
+        try:
+            if exc:
+                await db.rollback()
+            else:
+                await db.commit()
+        finally:
+            await db.close()
+            self._db.set(None)
@@ -1,17 +1,23 @@
 from src.core.uow import UnitOfWork
 from src.repositories.task_repository import TaskRepository
 from src.repositories.outbox_repository import OutboxRepository
+from src.repositories.task_counter_repository import TaskCounterRepository
 from src.services.task_service import TaskService
-from src.core.database import async_session_maker
+from src.core.database import async_session_maker, read_session_maker
+from src.infra.cache.task_cache import get_task_cache
 
 
 async def get_task_service() -> TaskService:
     repo = TaskRepository()
     outbox = OutboxRepository()
+    counters = TaskCounterRepository()
     uow = UnitOfWork(async_session_maker)
 
     return TaskService(
         task_repo=repo,
         outbox_repo=outbox,
-        uow=uow
+        uow=uow,
+        read_uow=UnitOfWork(read_session_maker),
+        counter_repo=counters,
+        cache=get_task_cache(),
     )
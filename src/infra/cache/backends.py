@@ -0,0 +1,85 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from src.core import codec
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU с TTL на запись."""
+
+    def __init__(self, max_size: int = 10000):
+        self._max_size = max_size
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def discard(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class InMemorySharedCache(LRUCache):
+    """Локальная замена общего кэша для тестов и разработки: хранит значения сериализованными, как Redis."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await super().get(key)
+        return codec.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await super().set(key, codec.dumps(value), ttl)
+
+
+class RedisCache(CacheBackend):
+    def __init__(self, url: str, prefix: str = "tasks:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("TASK_CACHE_SHARED_URL задан, но пакет redis не установлен") from e
+        self._client = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self._prefix + key)
+        return codec.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(self._prefix + key, codec.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._prefix + key)
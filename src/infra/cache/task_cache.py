@@ -0,0 +1,98 @@
+from typing import Optional
+from uuid import UUID
+
+from src.core.logging import get_logger
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.infra.cache.backends import CacheBackend, LRUCache, RedisCache
+
+logger = get_logger("TaskCache")
+
+local_hits = metrics.counter("cache.task.local_hits")
+shared_hits = metrics.counter("cache.task.shared_hits")
+misses = metrics.counter("cache.task.misses")
+invalidations = metrics.counter("cache.task.invalidations")
+shared_errors = metrics.counter("cache.task.shared_errors")
+local_size = metrics.gauge("cache.task.local_size")
+
+
+class TaskCache:
+    """Двухуровневый кэш представлений задач: in-process LRU перед необязательным общим бэкендом.
+
+    Ошибки общего бэкенда не ломают чтение - запрос просто уходит в БД.
+    """
+
+    def __init__(
+            self,
+            local: LRUCache,
+            shared: Optional[CacheBackend] = None,
+            local_ttl: float = settings.TASK_CACHE_TTL,
+            shared_ttl: float = settings.TASK_CACHE_SHARED_TTL,
+    ):
+        self._local = local
+        self._shared = shared
+        self._local_ttl = local_ttl
+        self._shared_ttl = shared_ttl
+
+    async def get(self, task_id: UUID) -> Optional[dict]:
+        key = str(task_id)
+        value = await self._local.get(key)
+        if value is not None:
+            local_hits.inc()
+            return value
+
+        if self._shared is not None:
+            try:
+                value = await self._shared.get(key)
+            except Exception as e:
+                shared_errors.inc()
+                logger.warning("Shared cache get failed: %s", e)
+                value = None
+            if value is not None:
+                shared_hits.inc()
+                await self._local.set(key, value, self._local_ttl)
+                return value
+
+        misses.inc()
+        return None
+
+    async def set(self, task_id: UUID, value: dict) -> None:
+        key = str(task_id)
+        await self._local.set(key, value, self._local_ttl)
+        local_size.set(len(self._local))
+        if self._shared is not None:
+            try:
+                await self._shared.set(key, value, self._shared_ttl)
+            except Exception as e:
+                shared_errors.inc()
+                logger.warning("Shared cache set failed: %s", e)
+
+    async def invalidate(self, *task_ids: UUID) -> None:
+        for task_id in task_ids:
+            key = str(task_id)
+            await self._local.delete(key)
+            if self._shared is not None:
+                try:
+                    await self._shared.delete(key)
+                except Exception as e:
+                    shared_errors.inc()
+                    logger.warning("Shared cache delete failed: %s", e)
+            invalidations.inc()
+
+    def invalidate_local(self, task_id: UUID) -> None:
+        """Сбрасывает только локальный уровень - для уведомлений о записи из другого процесса."""
+        self._local.discard(str(task_id))
+        invalidations.inc()
+
+
+_task_cache: Optional[TaskCache] = None
+
+
+def get_task_cache() -> Optional[TaskCache]:
+    global _task_cache
+    if not settings.TASK_CACHE_ENABLED:
+        return None
+    if _task_cache is None:
+        shared = RedisCache(settings.TASK_CACHE_SHARED_URL) if settings.TASK_CACHE_SHARED_URL else None
+        _task_cache = TaskCache(LRUCache(settings.TASK_CACHE_MAX_SIZE), shared)
+    return _task_cache
@@ -1,16 +1,26 @@
 # src/app/mq/client.py
 import asyncio
-import json
-import math
 from typing import Any, Callable, Optional, Coroutine
+from uuid import UUID
 
 import aio_pika
 import aiormq
 from aio_pika import ExchangeType, Message, DeliveryMode
 from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
 
+from src.core import codec
 from src.core.logging import get_logger
 from src.core.settings import settings
+from src.infra.mq.envelope import (
+    CONTENT_TYPE_JSON,
+    CONTENT_TYPE_TASK_EVENT,
+    ENVELOPE_VERSION,
+    TASK_TYPE_HEADER,
+    VERSION_HEADER,
+    encode_task_event,
+)
+from src.infra.mq.publisher import PublisherPool, backoff_delay
+from src.models.tasks import Priority
 
 logger = get_logger("MessageQueueClientAsync")
 
@@ -39,6 +49,17 @@ class MessageQueueClientAsync:
         self._exchange: Optional[aio_pika.Exchange] = None
         self._lock = asyncio.Lock()
         self._closing = False
+        self._publisher = PublisherPool(self._get_connection)
+
+    @property
+    def publisher(self) -> PublisherPool:
+        """Общий для процесса пул каналов публикации; им же пользуется outbox-релей."""
+        return self._publisher
+
+    async def _get_connection(self) -> aio_pika.abc.AbstractConnection:
+        if self._connection is None or self._connection.is_closed:
+            await self.configure()
+        return self._connection
 
     async def configure(self) -> None:
         async with self._lock:
@@ -56,9 +77,9 @@ class MessageQueueClientAsync:
                 dlq_queue = await self._pub_channel.declare_queue(settings.DLQ, durable=True)
                 await dlq_queue.bind(dlx)
 
-                await self._declare_queue_with_dlx(settings.QUEUE_HIGH, settings.ROUTING_KEY_HIGH)
-                await self._declare_queue_with_dlx(settings.QUEUE_MEDIUM, settings.ROUTING_KEY_MEDIUM)
-                await self._declare_queue_with_dlx(settings.QUEUE_LOW, settings.ROUTING_KEY_LOW)
+                for queue_name, routing_key in self.priority_queues().items():
+                    await self._declare_queue_with_dlx(queue_name, routing_key)
+                    await self._declare_retry_queues(queue_name, routing_key)
 
                 logger.info("RabbitMQ configured, exchange and queues declared.")
             except Exception as exc:
@@ -86,37 +107,87 @@ class MessageQueueClientAsync:
         logger.info("Queue '%s' bound to exchange '%s' with routing_key '%s'", queue_name, self._exchange.name,
                     routing_key)
 
+    @staticmethod
+    def priority_queues() -> dict[str, str]:
+        return {
+            settings.QUEUE_HIGH: settings.ROUTING_KEY_HIGH,
+            settings.QUEUE_MEDIUM: settings.ROUTING_KEY_MEDIUM,
+            settings.QUEUE_LOW: settings.ROUTING_KEY_LOW,
+        }
+
+    @staticmethod
+    def retry_queue_name(queue_name: str, delay_ms: int) -> str:
+        return f"{queue_name}.retry.{delay_ms}"
+
+    async def _declare_retry_queues(self, queue_name: str, routing_key: str):
+        # Сообщение лежит в TTL-очереди без потребителей и по истечении delay_ms
+        # через dead-letter возвращается в исходную очередь приоритета.
+        for delay_ms in sorted(set(settings.RETRY_DELAYS_MS)):
+            retry_queue = self.retry_queue_name(queue_name, delay_ms)
+            args = {
+                "x-message-ttl": delay_ms,
+                "x-dead-letter-exchange": settings.EXCHANGE_TASKS,
+                "x-dead-letter-routing-key": routing_key,
+            }
+            try:
+                await self._pub_channel.declare_queue(retry_queue, durable=True, arguments=args)
+            except aiormq.exceptions.ChannelPreconditionFailed:
+                logger.warning("Retry queue '%s' exists with different arguments. Recreating...", retry_queue)
+                await self._pub_channel.reopen()
+                await self._pub_channel.queue_delete(retry_queue)
+                await self._pub_channel.declare_queue(retry_queue, durable=True, arguments=args)
+        logger.info("Retry queues for '%s' declared: %s", queue_name, settings.RETRY_DELAYS_MS)
+
+    def _origin_queue(self, message: AbstractIncomingMessage) -> str:
+        headers = message.headers or {}
+        origin = headers.get("x-origin-queue")
+        if origin:
+            return origin.decode() if isinstance(origin, bytes) else str(origin)
+        queues = self.priority_queues()
+        if message.routing_key in queues:
+            return message.routing_key
+        by_routing_key = {routing_key: queue_name for queue_name, routing_key in queues.items()}
+        return by_routing_key.get(message.routing_key, settings.QUEUE_MEDIUM)
+
     async def close(self):
         self._closing = True
         try:
+            await self._publisher.close()
             if self._connection:
                 await self._connection.close()
         except Exception:
             logger.exception("Error closing RabbitMQ connection")
 
-    async def _publish(self, body: bytes, routing_key: str = "", exchange: Optional[str] = None, max_retries: int = 5):
+    async def _publish(
+            self,
+            body: bytes,
+            routing_key: str = "",
+            exchange: Optional[str] = None,
+            max_retries: int = 5,
+            content_type: Optional[str] = None,
+            headers: Optional[dict] = None,
+    ):
+        message = aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            headers=headers,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
         attempt = 0
-        base_delay = 1.0
         while True:
             try:
-                if self._pub_channel is None or self._pub_channel.is_closed:
-                    await self.configure()
-                message = aio_pika.Message(body=body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT)
-                await self._exchange.publish(message, routing_key=routing_key)
+                await self._publisher.publish(message, routing_key=routing_key, exchange=exchange or settings.EXCHANGE_TASKS)
                 return
             except (aio_pika.exceptions.AMQPConnectionError, aiormq.exceptions.ChannelClosed) as ex:
                 attempt += 1
                 if attempt > max_retries:
                     logger.exception("Max publish retries reached; message lost")
                     raise
-                delay = base_delay * (2 ** (attempt - 1))
-                jitter = min(0.5, delay * 0.1)
-                await asyncio.sleep(delay + (jitter * (math.random() - 0.5) if hasattr(math, "random") else 0))
-                logger.warning("Publish failed (attempt %d/%d), reconnecting: %s", attempt, max_retries, ex)
-                try:
-                    await self.configure()
-                except Exception:
-                    logger.warning("Reconfigure failed; will retry publish after delay")
+                delay = backoff_delay(attempt)
+                logger.warning(
+                    "Publish failed (attempt %d/%d), retrying in %.2fs: %s", attempt, max_retries, delay, ex
+                )
+                await asyncio.sleep(delay)
             except Exception as ex:
                 logger.exception("Unexpected publish error: %s", ex)
                 raise
@@ -125,16 +196,44 @@ class MessageQueueClientAsync:
         rk = priority.lower()
         if rk not in (settings.ROUTING_KEY_HIGH, settings.ROUTING_KEY_MEDIUM, settings.ROUTING_KEY_LOW):
             rk = settings.ROUTING_KEY_MEDIUM
-        body = json.dumps(payload).encode()
-        await self._publish(body=body, routing_key=rk)
+        body = codec.dumps(payload)
+        await self._publish(body=body, routing_key=rk, content_type=CONTENT_TYPE_JSON)
 
-    async def basic_consume(self, queue_name: str, callback: Callable[[AbstractIncomingMessage], Coroutine[Any, Any, None]], prefetch_count: int = settings.DEFAULT_PREFETCH_COUNT):
-        if self._consumer_channel is None or self._consumer_channel.is_closed:
+    async def publish_task_event(
+            self,
+            task_id: UUID,
+            event_type: str,
+            priority: Priority = Priority.MEDIUM,
+            task_type: Optional[str] = None,
+    ):
+        rk = priority.value.lower()
+        body = encode_task_event(task_id, event_type, priority)
+        headers = {VERSION_HEADER: ENVELOPE_VERSION}
+        if task_type:
+            headers[TASK_TYPE_HEADER] = task_type
+        await self._publish(
+            body=body,
+            routing_key=rk,
+            content_type=CONTENT_TYPE_TASK_EVENT,
+            headers=headers,
+        )
+
+    async def new_channel(self) -> AbstractChannel:
+        if self._connection is None or self._connection.is_closed:
             await self.configure()
-        await self._consumer_channel.set_qos(prefetch_count=prefetch_count)
-        queue = await self._consumer_channel.get_queue(queue_name)
-        await queue.consume(callback, no_ack=False)
+        return await self._connection.channel()
+
+    async def basic_consume(self, queue_name: str, callback: Callable[[AbstractIncomingMessage], Coroutine[Any, Any, None]], prefetch_count: int = settings.DEFAULT_PREFETCH_COUNT, channel: Optional[AbstractChannel] = None, global_qos: bool = False):
+        if channel is None:
+            if self._consumer_channel is None or self._consumer_channel.is_closed:
+                await self.configure()
+            channel = self._consumer_channel
+        # global_qos - лимит на весь канал; только его можно менять для уже запущенного потребителя.
+        await channel.set_qos(prefetch_count=prefetch_count, global_=global_qos)
+        queue = await channel.get_queue(queue_name)
+        consumer_tag = await queue.consume(callback, no_ack=False)
         logger.info("Consuming on queue %s with prefetch=%d", queue_name, prefetch_count)
+        return queue, consumer_tag
 
     async def handle_failed_message(self, message: AbstractIncomingMessage):
 
@@ -149,29 +248,43 @@ class MessageQueueClientAsync:
             await self.send_to_dlq(message, reason=f"exhausted_attempts={attempts}")
             await message.ack()
 
+    @staticmethod
+    def _copy_message(message: AbstractIncomingMessage, headers: dict) -> Message:
+        return Message(
+            body=message.body,
+            content_type=message.content_type,
+            message_id=message.message_id,
+            delivery_mode=DeliveryMode.PERSISTENT,
+            headers=headers,
+        )
+
+    # Повторы, DLQ и отложенные сообщения идут через пул с подтверждениями: исходное
+    # сообщение подтверждается только после того, как брокер принял копию.
+    async def defer(self, message: AbstractIncomingMessage):
+        """Откладывает сообщение через первую очередь задержки, не расходуя попытку."""
+        origin_queue = self._origin_queue(message)
+        retry_queue = self.retry_queue_name(origin_queue, settings.RETRY_DELAYS_MS[0])
+        headers = dict(message.headers or {})
+        headers["x-origin-queue"] = origin_queue
+        await self._publisher.publish(self._copy_message(message, headers), routing_key=retry_queue)
+        await message.ack()
+
     async def send_to_dlq(self, message: AbstractIncomingMessage, reason: str = ""):
         headers = dict(message.headers or {})
         headers["x-death-reason"] = reason
-        msg = Message(body=message.body, delivery_mode=DeliveryMode.PERSISTENT, headers=headers)
-
-        if self._exchange is None:
-            await self.configure()
-
-        dlx_exchange = await self._pub_channel.get_exchange(settings.DLX)
-        if dlx_exchange is None:
-            dlx_exchange = await self._pub_channel.declare_exchange(settings.DLX, ExchangeType.FANOUT, durable=True)
-
-        await dlx_exchange.publish(msg, routing_key="")
-        logger.warning("Moved message to DLQ: %s", headers.get("message_id", "<no-id>"))
+        await self._publisher.publish(self._copy_message(message, headers), routing_key="", exchange=settings.DLX)
+        logger.warning("Moved message to DLQ: %s", message.message_id or "<no-id>")
 
     async def republish_to_retry(self, message: AbstractIncomingMessage, attempt: int):
-        idx = min(attempt - 1, len(settings.RETRY_DELAYS_MS) - 1)
-        delay_ms = settings.RETRY_DELAYS_MS[idx]
-        retry_queue = f"retry_{delay_ms}"
+        delays = settings.RETRY_DELAYS_MS
+        delay_ms = delays[min(attempt - 1, len(delays) - 1)]
+        origin_queue = self._origin_queue(message)
+        retry_queue = self.retry_queue_name(origin_queue, delay_ms)
 
         headers = dict(message.headers or {})
         headers["attempts"] = attempt
+        headers["x-origin-queue"] = origin_queue
+        headers["x-retry-delay-ms"] = delay_ms
 
-        msg = Message(body=message.body, delivery_mode=DeliveryMode.PERSISTENT, headers=headers)
-        await self._pub_channel.default_exchange.publish(msg, routing_key=retry_queue)
+        await self._publisher.publish(self._copy_message(message, headers), routing_key=retry_queue)
         logger.info("Republished message to retry queue %s (attempt=%d)", retry_queue, attempt)
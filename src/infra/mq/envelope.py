@@ -0,0 +1,82 @@
+"""Формат тела сообщений о задачах.
+
+Бинарный конверт (CONTENT_TYPE_TASK_EVENT) - фиксированная структура:
+версия (1 байт), id задачи (16 байт), тип события (1 байт), приоритет (1 байт).
+Формат передается в content_type и заголовке x-envelope-version; сообщения
+с другим content_type читаются как JSON. Тип задачи в обоих форматах передается
+в заголовке x-task-type, чтобы воркер мог выбрать обработчик до разбора тела,
+тип события - в x-event-type (в JSON-теле его нет).
+"""
+import struct
+from typing import Any, Optional
+from uuid import UUID
+
+from src.core import codec
+from src.core.settings import settings
+from src.models.tasks import Priority
+
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_TASK_EVENT = "application/vnd.task-event"
+VERSION_HEADER = "x-envelope-version"
+TASK_TYPE_HEADER = "x-task-type"
+EVENT_TYPE_HEADER = "x-event-type"
+ENVELOPE_VERSION = 1
+
+_TASK_EVENT = struct.Struct(">B16sBB")
+
+# Коды только добавляются в конец: их порядок - часть формата.
+EVENT_TYPES = ("task.created", "task.deleted")
+PRIORITIES = (Priority.LOW, Priority.MEDIUM, Priority.HIGH)
+_EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES, 1)}
+_PRIORITY_CODES = {priority.value: code for code, priority in enumerate(PRIORITIES, 1)}
+
+
+def _pack(task_id: bytes, event_type: str, priority: Optional[str]) -> bytes:
+    return _TASK_EVENT.pack(
+        ENVELOPE_VERSION,
+        task_id,
+        _EVENT_CODES[event_type],
+        _PRIORITY_CODES[priority] if priority else 0,
+    )
+
+
+def encode_task_event(task_id: UUID, event_type: str, priority: Optional[Priority] = None) -> bytes:
+    return _pack(task_id.bytes, event_type, priority)
+
+
+def decode_task_event(body: bytes) -> dict:
+    if len(body) != _TASK_EVENT.size:
+        raise ValueError(f"Некорректная длина конверта: {len(body)}")
+    version, task_id, event_code, priority_code = _TASK_EVENT.unpack(body)
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия конверта: {version}")
+    return {
+        "task_id": UUID(bytes=task_id),
+        "event_type": EVENT_TYPES[event_code - 1],
+        "priority": PRIORITIES[priority_code - 1] if priority_code else None,
+    }
+
+
+def encode_message(payload: dict, event_type: str, fmt: str = settings.MQ_MESSAGE_FORMAT) -> tuple[bytes, str, dict]:
+    """Возвращает (body, content_type, headers) для события outbox.
+
+    События, не описанные в бинарной схеме, уходят как JSON.
+    """
+    task_type = payload.get("payload", {}).get("type")
+    headers = {EVENT_TYPE_HEADER: event_type}
+    if task_type:
+        headers[TASK_TYPE_HEADER] = task_type
+    if fmt == "binary" and event_type in _EVENT_CODES and "task_id" in payload:
+        priority = payload.get("payload", {}).get("priority")
+        # В outbox id хранится строкой; fromhex заметно дешевле, чем собирать UUID.
+        task_id = bytes.fromhex(str(payload["task_id"]).replace("-", ""))
+        body = _pack(task_id, event_type, priority)
+        headers[VERSION_HEADER] = ENVELOPE_VERSION
+        return body, CONTENT_TYPE_TASK_EVENT, headers
+    return codec.dumps(payload), CONTENT_TYPE_JSON, headers
+
+
+def decode_message(body: bytes, content_type: Optional[str] = None) -> Any:
+    if content_type == CONTENT_TYPE_TASK_EVENT:
+        return decode_task_event(body)
+    return codec.loads(body)
@@ -0,0 +1,134 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Hashable, Optional
+
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractExchange
+
+from src.core.logging import get_logger
+from src.core.metrics import metrics
+from src.core.settings import settings
+
+logger = get_logger("PublisherPool")
+
+published_total = metrics.counter("mq.publish.total")
+failed_total = metrics.counter("mq.publish.failed_total")
+in_flight_gauge = metrics.gauge("mq.publish.in_flight")
+confirm_seconds = metrics.histogram("mq.publish.confirm_seconds")
+
+
+def backoff_delay(attempt: int, base: float = settings.MQ_RECONNECT_BACKOFF_BASE,
+                  cap: float = settings.MQ_RECONNECT_BACKOFF_MAX) -> float:
+    """Экспоненциальная задержка с полным джиттером, чтобы клиенты не переподключались синхронно."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class PublisherPool:
+    """Пул каналов с publisher confirms поверх общего соединения процесса.
+
+    На каждом канале одновременно в полете до window неподтвержденных сообщений:
+    публикации идут конвейером, а подтверждения приходят пачками. Блокировку
+    соединения брокером (connection.blocked) соблюдает aiormq - запись кадров
+    приостанавливается до unblocked, а окно ограничивает, сколько сообщений
+    накопится за это время.
+
+    Сообщения с одинаковым key (например, id агрегата) всегда идут через один канал:
+    порядок между каналами RabbitMQ не гарантирует.
+    """
+
+    def __init__(
+            self,
+            connection_factory: Callable[[], Awaitable[aio_pika.abc.AbstractConnection]],
+            size: int = settings.MQ_PUBLISH_CHANNELS,
+            window: int = settings.MQ_CONFIRM_WINDOW,
+    ):
+        self._connection_factory = connection_factory
+        self._size = size
+        self._window = window
+        self._channels: list[Optional[AbstractChannel]] = [None] * size
+        self._windows = [asyncio.Semaphore(window) for _ in range(size)]
+        self._exchanges: dict[tuple[int, str], AbstractExchange] = {}
+        self._next = 0
+        self._in_flight = 0
+        self._lock = asyncio.Lock()
+
+    async def _channel(self, index: int) -> AbstractChannel:
+        channel = self._channels[index]
+        if channel is not None and not channel.is_closed:
+            return channel
+        async with self._lock:
+            channel = self._channels[index]
+            if channel is None or channel.is_closed:
+                connection = await self._connection_factory()
+                channel = await connection.channel(publisher_confirms=True)
+                self._channels[index] = channel
+                self._exchanges = {key: ex for key, ex in self._exchanges.items() if key[0] != index}
+            return channel
+
+    async def _exchange(self, index: int, name: str) -> AbstractExchange:
+        channel = await self._channel(index)
+        exchange = self._exchanges.get((index, name))
+        if exchange is None:
+            exchange = channel.default_exchange if not name else await channel.get_exchange(name, ensure=False)
+            self._exchanges[(index, name)] = exchange
+        return exchange
+
+    def _index(self, key: Optional[Hashable]) -> int:
+        if key is not None:
+            return hash(key) % self._size
+        index = self._next
+        self._next = (index + 1) % self._size
+        return index
+
+    async def publish(
+            self,
+            message: aio_pika.Message,
+            routing_key: str,
+            exchange: str = "",
+            key: Optional[Hashable] = None,
+    ) -> None:
+        """Публикует сообщение и возвращается после подтверждения брокера."""
+        index = self._index(key)
+        async with self._windows[index]:
+            self._in_flight += 1
+            in_flight_gauge.set(self._in_flight)
+            started = time.perf_counter()
+            try:
+                target = await self._exchange(index, exchange)
+                await target.publish(message, routing_key=routing_key)
+                published_total.inc()
+            except Exception:
+                failed_total.inc()
+                raise
+            finally:
+                confirm_seconds.observe(time.perf_counter() - started)
+                self._in_flight -= 1
+                in_flight_gauge.set(self._in_flight)
+
+    async def publish_many(
+            self,
+            messages: list[tuple[aio_pika.Message, str]],
+            exchange: str = "",
+            keys: Optional[list[Hashable]] = None,
+    ) -> list[Optional[BaseException]]:
+        """Публикует пачку конвейером; для каждого сообщения - None или ошибка."""
+        keys = keys or [None] * len(messages)
+        results = await asyncio.gather(
+            *(
+                self.publish(message, routing_key, exchange, key)
+                for (message, routing_key), key in zip(messages, keys)
+            ),
+            return_exceptions=True,
+        )
+        return [result if isinstance(result, BaseException) else None for result in results]
+
+    async def close(self):
+        for channel in self._channels:
+            if channel is not None and not channel.is_closed:
+                try:
+                    await channel.close()
+                except Exception:
+                    logger.exception("Error closing publisher channel")
+        self._channels = [None] * self._size
+        self._exchanges.clear()
@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Optional
+from uuid import UUID
+
+from src.core.logging import get_logger
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.infra.cache.task_cache import TaskCache
+from src.infra.pg.listener import PgNotificationListener
+from src.models.tasks import Status, TERMINAL_STATUSES
+
+logger = get_logger("TaskNotificationHub")
+
+waiters_gauge = metrics.gauge("hub.waiters")
+subscribers_gauge = metrics.gauge("hub.subscribers")
+events_total = metrics.counter("hub.events_total")
+dropped_total = metrics.counter("hub.dropped_total")
+
+
+class TaskNotificationHub:
+    """Раздает события о смене статуса задач ожидающим клиентам внутри процесса.
+
+    Один LISTEN на процесс вместо запроса в БД на каждого ожидающего клиента.
+    """
+
+    def __init__(self, queue_size: int = settings.SSE_QUEUE_SIZE):
+        self._waiters: dict[UUID, set[asyncio.Event]] = {}
+        self._waiter_count = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._queue_size = queue_size
+
+    def publish(self, task_id: UUID, status: Status):
+        events_total.inc()
+        if status not in TERMINAL_STATUSES:
+            return
+        waiters = self._waiters.pop(task_id, ())
+        for event in waiters:
+            event.set()
+        if waiters:
+            self._waiter_count -= len(waiters)
+            waiters_gauge.set(self._waiter_count)
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait((task_id, status))
+            except asyncio.QueueFull:
+                dropped_total.inc()
+
+    @contextmanager
+    def watch(self, task_id: UUID):
+        event = asyncio.Event()
+        self._waiters.setdefault(task_id, set()).add(event)
+        self._waiter_count += 1
+        waiters_gauge.set(self._waiter_count)
+        try:
+            yield event
+        finally:
+            # Если publish уже забрал ожидающих этой задачи, он же уменьшил счетчик.
+            waiters = self._waiters.get(task_id)
+            if waiters is not None and event in waiters:
+                waiters.discard(event)
+                if not waiters:
+                    self._waiters.pop(task_id, None)
+                self._waiter_count -= 1
+                waiters_gauge.set(self._waiter_count)
+
+    @contextmanager
+    def subscribe(self):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        subscribers_gauge.set(len(self._subscribers))
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            subscribers_gauge.set(len(self._subscribers))
+
+
+def parse_status_payload(payload: str) -> Optional[tuple[UUID, Status]]:
+    try:
+        task_id, status = payload.split(":", 1)
+        return UUID(task_id), Status(status)
+    except ValueError:
+        logger.warning("Invalid task status notification: %r", payload)
+        return None
+
+
+class TaskEventsListener:
+    """Слушает NOTIFY о смене статусов, сбрасывает локальный кэш и будит хаб."""
+
+    def __init__(self, hub: TaskNotificationHub, cache: Optional[TaskCache] = None):
+        self._hub = hub
+        self._cache = cache
+        self._listener = PgNotificationListener(settings.TASK_EVENTS_CHANNEL, self._on_notify)
+
+    def _on_notify(self, payload: str):
+        parsed = parse_status_payload(payload)
+        if parsed is None:
+            return
+        task_id, status = parsed
+        if self._cache is not None:
+            self._cache.invalidate_local(task_id)
+        self._hub.publish(task_id, status)
+
+    async def run(self, retry_interval: float = 5.0):
+        try:
+            while True:
+                if not self._listener.is_connected:
+                    try:
+                        await self._listener.start()
+                    except Exception as e:
+                        logger.warning("Task events LISTEN unavailable: %s", e)
+                await asyncio.sleep(retry_interval)
+        finally:
+            await self._listener.close()
+
+
+_hub: Optional[TaskNotificationHub] = None
+
+
+def get_notification_hub() -> TaskNotificationHub:
+    global _hub
+    if _hub is None:
+        _hub = TaskNotificationHub()
+    return _hub
@@ -0,0 +1,50 @@
+from typing import Callable, Optional
+
+import asyncpg
+
+from src.core.database import ASYNCPG_DSN
+from src.core.logging import get_logger
+
+logger = get_logger("PgNotificationListener")
+
+
+class PgNotificationListener:
+    """Держит отдельное asyncpg-соединение с LISTEN на канале Postgres."""
+
+    def __init__(self, channel: str, callback: Callable[[str], None], dsn: str = ASYNCPG_DSN):
+        self._channel = channel
+        self._callback = callback
+        self._dsn = dsn
+        self._conn: Optional[asyncpg.Connection] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self) -> None:
+        if self.is_connected:
+            return
+        self._conn = await asyncpg.connect(self._dsn)
+        self._conn.add_termination_listener(self._on_terminated)
+        await self._conn.add_listener(self._channel, self._on_notify)
+        logger.info("Listening on Postgres channel '%s'", self._channel)
+
+    async def close(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            await self._conn.close()
+        except Exception:
+            logger.exception("Error closing LISTEN connection")
+        finally:
+            self._conn = None
+
+    def _on_notify(self, conn, pid, channel, payload):
+        try:
+            self._callback(payload)
+        except Exception:
+            logger.exception("Notification callback failed for channel '%s'", channel)
+
+    def _on_terminated(self, conn):
+        logger.warning("LISTEN connection for channel '%s' was terminated", self._channel)
+        self._conn = None
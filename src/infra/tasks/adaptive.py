@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from aio_pika.abc import AbstractChannel
+
+from src.core.database import pool_wait_seconds
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.infra.tasks.limiter import ConcurrencyLimiter
+
+
+@dataclass
+class WindowStats:
+    samples: int
+    errors: int
+    latency_p95: Optional[float]
+    peak_in_flight: int
+    pool_wait: Optional[float]
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.samples if self.samples else 0.0
+
+
+def adaptive_prefetch(limit: int) -> int:
+    # Запас сообщений в канале, чтобы освободившийся слот не ждал доставки;
+    # сверху prefetch ограничен через ADAPTIVE_MAX_CONCURRENCY.
+    return limit * max(1, settings.WORKER_PREFETCH_MULTIPLIER)
+
+
+class AdaptiveConcurrency:
+    """AIMD-регулятор конкурентности и prefetch одной очереди.
+
+    Раз в interval смотрит на окно обработанных сообщений: при росте p95 латентности,
+    доли ошибок или ожидания соединения из пула лимит умножается на decrease_factor,
+    если лимит был выбран полностью и все в норме - растет на единицу.
+    """
+
+    def __init__(
+            self,
+            queue_name: str,
+            limiter: ConcurrencyLimiter,
+            channel: AbstractChannel,
+            logger: logging.Logger,
+            min_limit: int = settings.ADAPTIVE_MIN_CONCURRENCY,
+            max_limit: int = settings.ADAPTIVE_MAX_CONCURRENCY,
+            target_latency: float = settings.ADAPTIVE_TARGET_LATENCY,
+            max_error_rate: float = settings.ADAPTIVE_MAX_ERROR_RATE,
+            max_pool_wait: float = settings.ADAPTIVE_MAX_POOL_WAIT,
+            decrease_factor: float = settings.ADAPTIVE_DECREASE_FACTOR,
+            interval: float = settings.ADAPTIVE_INTERVAL,
+            fixed_prefetch: Optional[int] = None,
+    ):
+        self._queue_name = queue_name
+        self._limiter = limiter
+        self._channel = channel
+        self._logger = logger
+        self._min_limit = max(1, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._target_latency = target_latency
+        self._max_error_rate = max_error_rate
+        self._max_pool_wait = max_pool_wait
+        self._decrease_factor = decrease_factor
+        self._interval = interval
+        self._fixed_prefetch = fixed_prefetch
+
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._peak_in_flight = 0
+        snapshot = pool_wait_seconds.snapshot()
+        self._pool_wait_count, self._pool_wait_sum = snapshot["count"], snapshot["sum"]
+
+        prefix = f"worker.adaptive.{queue_name}"
+        self._concurrency_gauge = metrics.gauge(f"{prefix}.concurrency")
+        self._prefetch_gauge = metrics.gauge(f"{prefix}.prefetch")
+        self._latency_gauge = metrics.gauge(f"{prefix}.latency_p95")
+        self._error_rate_gauge = metrics.gauge(f"{prefix}.error_rate")
+        self._increases = metrics.counter(f"{prefix}.increases")
+        self._decreases = metrics.counter(f"{prefix}.decreases")
+        self._concurrency_gauge.set(limiter.limit)
+        self._prefetch_gauge.set(self.prefetch_for(limiter.limit))
+
+    def prefetch_for(self, limit: int) -> int:
+        if self._fixed_prefetch is not None:
+            return self._fixed_prefetch
+        return adaptive_prefetch(limit)
+
+    def record(self, latency: float, ok: bool):
+        self._latencies.append(latency)
+        if not ok:
+            self._errors += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._limiter.in_flight)
+
+    def _collect(self) -> WindowStats:
+        latencies, self._latencies = sorted(self._latencies), []
+        errors, self._errors = self._errors, 0
+        peak, self._peak_in_flight = self._peak_in_flight, self._limiter.in_flight
+
+        snapshot = pool_wait_seconds.snapshot()
+        waits = snapshot["count"] - self._pool_wait_count
+        pool_wait = (snapshot["sum"] - self._pool_wait_sum) / waits if waits else None
+        self._pool_wait_count, self._pool_wait_sum = snapshot["count"], snapshot["sum"]
+
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+        return WindowStats(len(latencies), errors, p95, peak, pool_wait)
+
+    def decide(self, limit: int, stats: WindowStats) -> int:
+        overloaded = (
+            stats.error_rate > self._max_error_rate
+            or (stats.latency_p95 is not None and stats.latency_p95 > self._target_latency)
+            or (stats.pool_wait is not None and stats.pool_wait > self._max_pool_wait)
+        )
+        if overloaded:
+            return max(self._min_limit, math.floor(limit * self._decrease_factor))
+        if stats.samples and stats.peak_in_flight >= limit:
+            return min(self._max_limit, limit + 1)
+        return limit
+
+    async def adjust(self) -> int:
+        stats = self._collect()
+        limit = self._limiter.limit
+        new_limit = self.decide(limit, stats)
+
+        self._latency_gauge.set(stats.latency_p95 or 0.0)
+        self._error_rate_gauge.set(stats.error_rate)
+        if new_limit != limit:
+            (self._increases if new_limit > limit else self._decreases).inc()
+            prefetch = self.prefetch_for(new_limit)
+            # Сначала сужаем prefetch, потом лимит: так при уменьшении брокер не
+            # досылает сообщения, которые все равно будут ждать слота. У очереди свой канал
+            # с одним потребителем, и только global-лимит канала RabbitMQ меняет на ходу -
+            # per-consumer qos действует лишь на потребителей, запущенных после вызова.
+            if self._fixed_prefetch is None:
+                await self._channel.set_qos(prefetch_count=prefetch, global_=True)
+            await self._limiter.set_limit(new_limit)
+            self._concurrency_gauge.set(new_limit)
+            self._prefetch_gauge.set(prefetch)
+            self._logger.info(
+                "Queue %s: concurrency %d -> %d, prefetch=%d (p95=%s errors=%.2f pool_wait=%s)",
+                self._queue_name, limit, new_limit, prefetch, stats.latency_p95, stats.error_rate, stats.pool_wait,
+            )
+        return new_limit
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.adjust()
+            except Exception as ex:
+                self._logger.warning("Adaptive controller for %s failed: %s", self._queue_name, ex)
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class MicroBatcher(Generic[T]):
+    """Копит запросы от конкурентных обработчиков и выполняет их одним вызовом flush.
+
+    Пачка уходит, когда набралось max_batch элементов или прошло max_delay секунд
+    с первого из них. submit() возвращает результат flush всей пачки или
+    пробрасывает его исключение.
+    """
+
+    def __init__(self, flush: Callable[[list[T]], Awaitable[Any]], max_batch: int, max_delay: float):
+        self._flush_fn = flush
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, item: T):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._start_flush)
+        return await future
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[T, asyncio.Future]]):
+        try:
+            result = await self._flush_fn([item for item, _ in batch])
+        except Exception as ex:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(ex)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
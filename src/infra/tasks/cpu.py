@@ -0,0 +1,34 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from src.core.settings import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_cpu_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if _executor is None and settings.WORKER_CPU_PROCESSES > 0:
+        _executor = ProcessPoolExecutor(max_workers=settings.WORKER_CPU_PROCESSES)
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Выполняет CPU-тяжелую функцию вне event loop, если включен пул процессов.
+
+    func и аргументы должны сериализоваться через pickle.
+    """
+    executor = get_cpu_executor()
+    if executor is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+def shutdown_cpu_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.core.uow import UnitOfWork
+from src.infra.cache.backends import LRUCache
+from src.infra.tasks.batching import MicroBatcher
+from src.repositories.processed_message_repository import ProcessedMessageRepository
+
+duplicates_total = metrics.counter("worker.dedup.duplicates_total")
+local_hits = metrics.counter("worker.dedup.local_hits")
+store_errors = metrics.counter("worker.dedup.store_errors")
+
+
+def parse_message_id(value: Optional[str]) -> Optional[UUID]:
+    if not value:
+        return None
+    try:
+        return UUID(value)
+    except ValueError:
+        return None
+
+
+class ProcessedMessageStore:
+    """Окно уже обработанных сообщений: LRU в процессе перед таблицей processed_messages.
+
+    Проверки и отметки от конкурентных обработчиков собираются в пачки. Ошибки таблицы
+    не останавливают обработку - дедупликация best-effort, доставка остается at-least-once.
+    """
+
+    def __init__(
+            self,
+            logger: logging.Logger,
+            uow: Optional[UnitOfWork] = None,
+            repository: Optional[ProcessedMessageRepository] = None,
+            local_size: int = settings.DEDUP_LOCAL_SIZE,
+            ttl: float = settings.DEDUP_TTL,
+            max_batch: int = settings.DEDUP_BATCH_SIZE,
+            max_delay_ms: float = settings.DEDUP_BATCH_DELAY_MS,
+    ):
+        self._logger = logger
+        self._uow = uow or UnitOfWork()
+        self._repository = repository or ProcessedMessageRepository()
+        self._local = LRUCache(local_size)
+        self._ttl = ttl
+        self._lookups = MicroBatcher(self._find_processed, max_batch, max_delay_ms / 1000)
+        self._marks = MicroBatcher(self._mark_processed, max_batch, max_delay_ms / 1000)
+
+    def _window_start(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=self._ttl)
+
+    async def _find_processed(self, ids: list[UUID]) -> set[UUID]:
+        async with self._uow:
+            return await self._repository.find_processed(self._uow.db, ids, self._window_start())
+
+    async def _mark_processed(self, ids: list[UUID]) -> None:
+        async with self._uow:
+            await self._repository.mark_processed(self._uow.db, ids)
+
+    async def seen(self, message_id: UUID) -> bool:
+        key = str(message_id)
+        if await self._local.get(key) is not None:
+            local_hits.inc()
+            duplicates_total.inc()
+            return True
+        try:
+            processed = await self._lookups.submit(message_id)
+        except Exception as ex:
+            store_errors.inc()
+            self._logger.warning("Dedup lookup failed, processing message %s: %s", message_id, ex)
+            return False
+        if message_id in processed:
+            await self._local.set(key, True, self._ttl)
+            duplicates_total.inc()
+            return True
+        return False
+
+    async def mark(self, message_id: UUID) -> None:
+        await self._local.set(str(message_id), True, self._ttl)
+        try:
+            await self._marks.submit(message_id)
+        except Exception as ex:
+            store_errors.inc()
+            self._logger.warning("Dedup mark failed for message %s: %s", message_id, ex)
+
+    async def close(self):
+        await self._lookups.close()
+        await self._marks.close()
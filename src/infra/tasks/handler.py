@@ -1,27 +1,62 @@
-import json
 import logging
+from typing import Optional
 from uuid import UUID
 from aio_pika import IncomingMessage
 
+from src.infra.mq.envelope import EVENT_TYPE_HEADER, TASK_TYPE_HEADER, decode_message
+from src.infra.tasks.cpu import run_cpu_bound
+from src.infra.tasks.dedup import ProcessedMessageStore, parse_message_id
+from src.infra.tasks.registry import HandlerRegistry, get_handler_registry
+from src.infra.tasks.status_writer import StatusBatchWriter
 from src.models.tasks import Status
 from src.services.task_service import TaskService
 
 
 class BaseMessageHandler:
-    def __init__(self, logger: logging.Logger, task_service: TaskService):
+    def __init__(
+            self,
+            logger: logging.Logger,
+            task_service: TaskService,
+            status_writer: Optional[StatusBatchWriter] = None,
+            dedup: Optional[ProcessedMessageStore] = None,
+            registry: Optional[HandlerRegistry] = None,
+    ):
         self._logger = logger
         self.task_service = task_service
+        self.status_writer = status_writer
+        self.dedup = dedup
+        self.registry = registry or get_handler_registry()
+
+    @staticmethod
+    def task_type(message: IncomingMessage) -> Optional[str]:
+        return (message.headers or {}).get(TASK_TYPE_HEADER)
+
+    def admit(self, message: IncomingMessage):
+        """Слот типа задачи сообщения; берется воркером до общего лимита очереди."""
+        return self.registry.admit(self.task_type(message))
 
     async def process(self, message: IncomingMessage):
+        # Повторные доставки (после падения воркера, nack или retry) отсеиваем до разбора тела.
+        message_id = parse_message_id(message.message_id) if self.dedup is not None else None
+        if message_id is not None and await self.dedup.seen(message_id):
+            self._logger.info("Skip duplicate message %s", message_id)
+            return
         try:
-            raw = message.body.decode("utf-8")
-            payload = json.loads(raw)
+            payload = decode_message(message.body, message.content_type)
         except Exception:
             self._logger.error("Invalid message format")
             return
-        await self.handle(payload)
+        if isinstance(payload, dict) and "event_type" not in payload:
+            # В JSON-теле тип события не хранится - он приходит заголовком.
+            payload["event_type"] = (message.headers or {}).get(EVENT_TYPE_HEADER, "task.created")
+        await self.handle(payload, self.task_type(message))
+        if message_id is not None:
+            await self.dedup.mark(message_id)
+
+    async def run_cpu_bound(self, func, *args, **kwargs):
+        return await run_cpu_bound(func, *args, **kwargs)
 
-    async def handle(self, payload: dict):
+    async def handle(self, payload: dict, task_type: Optional[str] = None):
         try:
             self._logger.info(f"payload in handle {payload}")
             task_id = payload.get("task_id")
@@ -29,13 +64,32 @@ class BaseMessageHandler:
                 self._logger.error("task_id not found in payload")
                 return
 
-            task_uuid = UUID(task_id)
+            task_uuid = task_id if isinstance(task_id, UUID) else UUID(task_id)
+            event_type = payload.get("event_type", "task.created")
+            if event_type != "task.created":
+                self._logger.info("Skip %s event for task %s", event_type, task_id)
+                return
 
-            await self.task_service.update_task_status(
-                task_uuid,
-                Status.COMPLETED
-            )
+            # Отмененную, пока сообщение ждало в очереди, задачу отдельно не читаем:
+            # guarded UPDATE по ALLOWED_TRANSITIONS не даст перевести ее в COMPLETED.
+            task_type = task_type or (payload.get("payload") or {}).get("type")
+            await self.registry.run(task_type, task_uuid, payload)
+            await self.set_status(task_uuid, Status.COMPLETED)
 
             self._logger.info(f"Task {task_id} as COMPLETED")
         except Exception as e:
             self._logger.error(f"Failed to process task completion: {e}")
+            raise
+
+    async def set_status(self, task_id: UUID, status: Status):
+        if self.status_writer is not None:
+            await self.status_writer.submit(task_id, status)
+        else:
+            if await self.task_service.update_task_status(task_id, status) is None:
+                self._logger.info("Task %s transition to %s rejected, skipping", task_id, status.value)
+
+    async def close(self):
+        if self.status_writer is not None:
+            await self.status_writer.close()
+        if self.dedup is not None:
+            await self.dedup.close()
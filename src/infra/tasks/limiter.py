@@ -0,0 +1,59 @@
+import asyncio
+
+
+class ConcurrencyLimiter:
+    """Семафор, лимит которого можно менять на ходу."""
+
+    def __init__(self, limit: int):
+        self._limit = max(1, int(limit))
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def saturated(self) -> bool:
+        return self._in_flight >= self._limit
+
+    async def set_limit(self, limit: int):
+        async with self._cond:
+            self._limit = max(1, int(limit))
+            self._cond.notify_all()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+
+def split_capacity(total: int, weights: dict[str, int]) -> dict[str, int]:
+    """Делит total слотов между ключами пропорционально весам, каждому минимум один."""
+    if not weights:
+        return {}
+    total = max(total, len(weights))
+    weight_sum = sum(max(w, 0) for w in weights.values()) or len(weights)
+    spare = total - len(weights)
+    shares = {key: spare * max(w, 0) / weight_sum for key, w in weights.items()}
+    result = {key: 1 + int(share) for key, share in shares.items()}
+    leftover = total - sum(result.values())
+    for key in sorted(shares, key=lambda k: shares[k] - int(shares[k]), reverse=True)[:leftover]:
+        result[key] += 1
+    return result
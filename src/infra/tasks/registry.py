@@ -0,0 +1,175 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.infra.tasks.limiter import ConcurrencyLimiter
+from src.models.tasks import DEFAULT_TASK_TYPE
+
+TaskTypeHandler = Callable[[UUID, dict], Awaitable[None]]
+
+
+class TaskTypeSaturated(Exception):
+    """У типа задач уже max_waiting сообщений ждут слота - сообщение нужно отложить, а не держать в prefetch."""
+
+    def __init__(self, task_type: str):
+        super().__init__(f"Тип задач {task_type} перегружен")
+        self.task_type = task_type
+
+
+@dataclass
+class TypePolicy:
+    concurrency: int = settings.TASK_TYPE_DEFAULT_CONCURRENCY
+    rate: float = settings.TASK_TYPE_DEFAULT_RATE
+    burst: Optional[float] = None
+    timeout: Optional[float] = settings.TASK_TYPE_DEFAULT_TIMEOUT
+    max_waiting: Optional[int] = settings.TASK_TYPE_DEFAULT_MAX_WAITING
+
+    @classmethod
+    def from_settings(cls, task_type: str) -> "TypePolicy":
+        overrides = settings.TASK_TYPE_POLICIES.get(task_type, {})
+        unknown = set(overrides) - set(_POLICY_FIELDS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры типа задач {task_type}: {', '.join(sorted(unknown))}")
+        return cls(**{key: _POLICY_FIELDS[key](value) for key, value in overrides.items()})
+
+
+_POLICY_FIELDS = {"concurrency": int, "rate": float, "burst": float, "timeout": float, "max_waiting": int}
+
+
+class TokenBucket:
+    """Токены пополняются со скоростью rate в секунду, но копятся не больше burst; rate <= 0 - без ограничения."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Забирает токен, при необходимости дожидаясь его; возвращает время ожидания."""
+        if self.rate <= 0:
+            return 0.0
+        started = time.monotonic()
+        # Ожидающие встают в очередь на блокировке, поэтому токены раздаются по порядку.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _TaskType:
+    def __init__(self, name: str, handler: TaskTypeHandler, policy: TypePolicy):
+        self.name = name
+        self.handler = handler
+        self.policy = policy
+        self.limiter = ConcurrencyLimiter(policy.concurrency)
+        self.max_waiting = policy.concurrency if policy.max_waiting is None else max(0, policy.max_waiting)
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.waiting = 0
+
+        prefix = f"worker.type.{name}"
+        self.processed_total = metrics.counter(f"{prefix}.processed_total")
+        self.failed_total = metrics.counter(f"{prefix}.failed_total")
+        self.timeouts_total = metrics.counter(f"{prefix}.timeouts_total")
+        self.deferred_total = metrics.counter(f"{prefix}.deferred_total")
+        self.in_flight = metrics.gauge(f"{prefix}.in_flight")
+        self.waiting_gauge = metrics.gauge(f"{prefix}.waiting")
+        self.saturation = metrics.gauge(f"{prefix}.saturation")
+        self.duration = metrics.histogram(f"{prefix}.duration_seconds")
+        self.throttled = metrics.histogram(f"{prefix}.throttled_seconds")
+
+    def update_gauges(self):
+        self.in_flight.set(self.limiter.in_flight)
+        self.waiting_gauge.set(self.waiting)
+        self.saturation.set(self.limiter.in_flight / self.limiter.limit)
+
+
+async def complete_task(task_id: UUID, payload: dict) -> None:
+    """Обработчик по умолчанию: работы нет, задача сразу считается выполненной."""
+
+
+class HandlerRegistry:
+    """Обработчики задач по типу со своими лимитом конкурентности, rate limit и таймаутом.
+
+    Незарегистрированные типы обрабатываются обработчиком DEFAULT_TASK_TYPE.
+    """
+
+    def __init__(self):
+        self._types: dict[str, _TaskType] = {}
+        self.register(DEFAULT_TASK_TYPE, complete_task)
+
+    def register(self, task_type: str, handler: TaskTypeHandler, policy: Optional[TypePolicy] = None):
+        self._types[task_type] = _TaskType(task_type, handler, policy or TypePolicy.from_settings(task_type))
+
+    def handler(self, task_type: str, policy: Optional[TypePolicy] = None):
+        def decorator(func: TaskTypeHandler) -> TaskTypeHandler:
+            self.register(task_type, func, policy)
+            return func
+        return decorator
+
+    def resolve(self, task_type: Optional[str]) -> _TaskType:
+        entry = self._types.get(task_type) if task_type else None
+        return entry or self._types[DEFAULT_TASK_TYPE]
+
+    @asynccontextmanager
+    async def admit(self, task_type: Optional[str]):
+        """Слот типа задач: лимит конкурентности, затем токен rate limit."""
+        entry = self.resolve(task_type)
+        if entry.limiter.saturated and entry.waiting >= entry.max_waiting:
+            entry.deferred_total.inc()
+            raise TaskTypeSaturated(entry.name)
+
+        entry.waiting += 1
+        entry.update_gauges()
+        try:
+            await entry.limiter.acquire()
+        finally:
+            entry.waiting -= 1
+        try:
+            entry.update_gauges()
+            entry.throttled.observe(await entry.bucket.acquire())
+            yield entry
+        finally:
+            await entry.limiter.release()
+            entry.update_gauges()
+
+    async def run(self, task_type: Optional[str], task_id: UUID, payload: dict) -> None:
+        entry = self.resolve(task_type)
+        started = time.perf_counter()
+        try:
+            if entry.policy.timeout:
+                await asyncio.wait_for(entry.handler(task_id, payload), entry.policy.timeout)
+            else:
+                await entry.handler(task_id, payload)
+        except asyncio.TimeoutError:
+            entry.timeouts_total.inc()
+            entry.failed_total.inc()
+            raise
+        except Exception:
+            entry.failed_total.inc()
+            raise
+        else:
+            entry.processed_total.inc()
+        finally:
+            entry.duration.observe(time.perf_counter() - started)
+
+
+_registry: Optional[HandlerRegistry] = None
+
+
+def get_handler_registry() -> HandlerRegistry:
+    global _registry
+    if _registry is None:
+        _registry = HandlerRegistry()
+    return _registry
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from src.core.metrics import metrics
+
+
+class AgingDispatcher:
+    """Общие слоты обработки для нескольких очередей приоритета со старением ожидания.
+
+    Освободившийся слот получает очередь с наибольшим score = ожидание головы / целевая
+    задержка очереди. Свежие сообщения high выигрывают у low, но чем дольше ждет low,
+    тем выше его score - голодания нет, а соотношение задается целевыми задержками.
+    """
+
+    def __init__(self, slots: int, targets: dict[str, float]):
+        self._slots = max(1, slots)
+        self._busy = 0
+        self._targets = targets
+        self._waiting: dict[str, deque[tuple[float, asyncio.Future]]] = {queue: deque() for queue in targets}
+        self._queue_wait = {queue: metrics.histogram(f"worker.queue_wait.{queue}") for queue in targets}
+        self._depth = {queue: metrics.gauge(f"worker.dispatch_waiting.{queue}") for queue in targets}
+        self._busy_gauge = metrics.gauge("worker.dispatch_busy")
+
+    @property
+    def busy(self) -> int:
+        return self._busy
+
+    def waiting(self, queue: str) -> int:
+        return len(self._waiting[queue])
+
+    def _pick(self, now: float) -> Optional[str]:
+        best, best_score = None, -1.0
+        for queue, waiting in self._waiting.items():
+            if not waiting:
+                continue
+            score = (now - waiting[0][0]) / self._targets[queue]
+            if score > best_score:
+                best, best_score = queue, score
+        return best
+
+    def _grant(self, queue: str, enqueued_at: float, now: float):
+        self._busy += 1
+        self._busy_gauge.set(self._busy)
+        self._queue_wait[queue].observe(now - enqueued_at)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._busy < self._slots:
+            queue = self._pick(now)
+            if queue is None:
+                return
+            enqueued_at, future = self._waiting[queue].popleft()
+            self._depth[queue].set(len(self._waiting[queue]))
+            if future.done():
+                continue
+            self._grant(queue, enqueued_at, now)
+            future.set_result(None)
+
+    async def acquire(self, queue: str):
+        now = time.monotonic()
+        if self._busy < self._slots and not any(self._waiting.values()):
+            self._grant(queue, now, now)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[queue].append((now, future))
+        self._depth[queue].set(len(self._waiting[queue]))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Слот мог быть выдан одновременно с отменой - возвращаем его.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self._busy -= 1
+        self._busy_gauge.set(self._busy)
+        self._dispatch()
+
+    def slot(self, queue: str) -> "DispatcherSlot":
+        return DispatcherSlot(self, queue)
+
+
+class DispatcherSlot:
+    """Интерфейс ConcurrencyLimiter поверх AgingDispatcher для одной очереди."""
+
+    def __init__(self, dispatcher: AgingDispatcher, queue: str):
+        self._dispatcher = dispatcher
+        self._queue = queue
+
+    async def acquire(self):
+        await self._dispatcher.acquire(self._queue)
+
+    async def release(self):
+        self._dispatcher.release()
@@ -0,0 +1,53 @@
+import logging
+import time
+from collections import defaultdict
+from uuid import UUID
+
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.infra.tasks.batching import MicroBatcher
+from src.models.tasks import Status
+from src.services.task_service import TaskService
+
+batch_size = metrics.histogram("worker.status_batch_size")
+flush_seconds = metrics.histogram("worker.status_flush_seconds")
+
+
+class StatusBatchWriter:
+    """Собирает смены статусов от обработчиков и пишет их пачкой в одной транзакции.
+
+    submit() возвращается только после коммита пачки, поэтому сообщение
+    подтверждается в RabbitMQ уже после записи в БД.
+    """
+
+    def __init__(
+            self,
+            task_service: TaskService,
+            logger: logging.Logger,
+            max_batch: int = settings.STATUS_BATCH_SIZE,
+            max_delay_ms: float = settings.STATUS_BATCH_DELAY_MS,
+    ):
+        self._task_service = task_service
+        self._logger = logger
+        self._batcher = MicroBatcher(self._flush, max_batch, max_delay_ms / 1000)
+
+    async def submit(self, task_id: UUID, status: Status):
+        await self._batcher.submit((task_id, status))
+
+    async def _flush(self, batch: list[tuple[UUID, Status]]):
+        updates: dict[Status, list[UUID]] = defaultdict(list)
+        for task_id, status in batch:
+            updates[status].append(task_id)
+
+        started = time.perf_counter()
+        try:
+            await self._task_service.update_tasks_status(dict(updates))
+        except Exception as ex:
+            self._logger.error("Status batch of %d failed: %s", len(batch), ex)
+            raise
+        finally:
+            flush_seconds.observe(time.perf_counter() - started)
+            batch_size.observe(len(batch))
+
+    async def close(self):
+        await self._batcher.close()
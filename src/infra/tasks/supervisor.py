@@ -0,0 +1,93 @@
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Any, Callable, Optional
+
+from src.core.settings import settings
+
+
+class _Child:
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.backoff = settings.WORKER_RESTART_BACKOFF_MIN
+        self.restart_at = 0.0
+
+
+class WorkerSupervisor:
+    """Запускает N процессов-воркеров, перезапускает упавшие и гасит их по сигналу.
+
+    target должен быть функцией уровня модуля: дочерние процессы стартуют через spawn.
+    """
+
+    def __init__(self, target: Callable[..., Any], args: tuple, processes: int, logger: logging.Logger):
+        self._target = target
+        self._args = args
+        self._ctx = multiprocessing.get_context("spawn")
+        self._children = [_Child(i) for i in range(max(1, processes))]
+        self._logger = logger
+        self._stopping = False
+
+    def _spawn(self, child: _Child):
+        child.process = self._ctx.Process(
+            target=self._target, args=self._args, name=f"worker-{child.index}", daemon=False
+        )
+        child.process.start()
+        child.started_at = time.monotonic()
+        self._logger.info("Started worker process %d (pid=%s)", child.index, child.process.pid)
+
+    def _request_stop(self, signum, frame):
+        if not self._stopping:
+            self._logger.info("Supervisor received signal %s, stopping workers", signum)
+        self._stopping = True
+
+    def _check(self, child: _Child):
+        process = child.process
+        if process is None or process.is_alive():
+            return
+        now = time.monotonic()
+        if child.restart_at == 0.0:
+            # Если процесс проработал дольше максимальной паузы, считаем его здоровым и сбрасываем backoff.
+            if now - child.started_at > settings.WORKER_RESTART_BACKOFF_MAX:
+                child.backoff = settings.WORKER_RESTART_BACKOFF_MIN
+            child.restart_at = now + child.backoff
+            self._logger.warning(
+                "Worker process %d exited with code %s, restarting in %.1fs",
+                child.index, process.exitcode, child.backoff,
+            )
+            child.backoff = min(child.backoff * 2, settings.WORKER_RESTART_BACKOFF_MAX)
+        elif now >= child.restart_at:
+            child.restart_at = 0.0
+            self._spawn(child)
+
+    def _shutdown(self):
+        for child in self._children:
+            if child.process is not None and child.process.is_alive():
+                child.process.terminate()
+
+        deadline = time.monotonic() + settings.WORKER_SHUTDOWN_TIMEOUT
+        for child in self._children:
+            if child.process is None:
+                continue
+            child.process.join(max(0.0, deadline - time.monotonic()))
+            if child.process.is_alive():
+                self._logger.warning("Worker process %d did not stop in time, killing", child.index)
+                child.process.kill()
+                child.process.join()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        for child in self._children:
+            self._spawn(child)
+
+        while not self._stopping:
+            for child in self._children:
+                self._check(child)
+            time.sleep(0.5)
+
+        self._shutdown()
+        self._logger.info("All worker processes stopped")
@@ -1,7 +1,15 @@
 import asyncio
 import logging
+import time
+from typing import Optional
 from aio_pika import IncomingMessage
+from src.core.settings import settings
+from src.infra.tasks.adaptive import AdaptiveConcurrency, adaptive_prefetch
+from src.infra.tasks.cpu import shutdown_cpu_executor
 from src.infra.tasks.handler import BaseMessageHandler
+from src.infra.tasks.limiter import ConcurrencyLimiter, split_capacity
+from src.infra.tasks.registry import TaskTypeSaturated
+from src.infra.tasks.scheduler import AgingDispatcher, DispatcherSlot
 from src.infra.mq.client import MessageQueueClientAsync
 
 
@@ -10,26 +18,165 @@ class BaseWorker:
         self._mq = mq_client
         self._handler = handler
         self._logger = logger
+        self._limiters: dict[str, ConcurrencyLimiter] = {}
+        self._controllers: dict[str, AdaptiveConcurrency] = {}
+        self._controller_tasks: list[asyncio.Task] = []
+        self._consumers = []
+        self._in_flight = 0
+        self._stopping = False
+        self._stopped = asyncio.Event()
 
-    async def run(self, queue_name: str):
-        async def _safe_consume(message: IncomingMessage):
+    async def _safe_consume(self, message: IncomingMessage) -> bool:
+        try:
+            self._logger.info("Worker process message: %s", message)
+            await self._handler.process(message)
+            await message.ack()
+            return True
+        except Exception as ex:
+            self._logger.exception("Worker failed to process message: %s", ex)
             try:
-                self._logger.info("Worker process message: %s", message)
-                await self._handler.process(message)
-                await message.ack()
-            except Exception as ex:
-                self._logger.exception("Worker failed to process message: %s", ex)
+                await self._mq.handle_failed_message(message)
+            except Exception as inner:
+                self._logger.exception("Failed handling failed message: %s", inner)
+                await message.nack(requeue=False)
+            return False
+
+    async def _on_message(
+            self,
+            message: IncomingMessage,
+            limiter: Optional[ConcurrencyLimiter | DispatcherSlot] = None,
+            controller: Optional[AdaptiveConcurrency] = None,
+    ):
+        self._in_flight += 1
+        try:
+            # Слот типа задачи берется раньше слота очереди: сообщения медленного типа
+            # ждут своей очереди, не занимая общий лимит.
+            async with self._handler.admit(message):
+                if limiter is not None:
+                    await limiter.acquire()
                 try:
-                    await self._mq.handle_failed_message(message)
-                except Exception as inner:
-                    self._logger.exception("Failed handling failed message: %s", inner)
-                    await message.nack(requeue=False)
+                    # Сообщения, которые еще не начали обрабатываться, при остановке возвращаем в очередь.
+                    if self._stopping:
+                        await message.nack(requeue=True)
+                        return
+                    started = time.perf_counter()
+                    ok = await self._safe_consume(message)
+                    if controller is not None:
+                        controller.record(time.perf_counter() - started, ok)
+                finally:
+                    if limiter is not None:
+                        await limiter.release()
+        except TaskTypeSaturated as ex:
+            # Очередь ожидания типа переполнена - не держим сообщение в prefetch, а откладываем.
+            self._logger.info("Deferring message: %s", ex)
+            try:
+                await self._mq.defer(message)
+            except Exception as inner:
+                self._logger.exception("Failed to defer message: %s", inner)
+                await message.nack(requeue=True)
+        finally:
+            self._in_flight -= 1
 
+    async def run(self, queue_name: str):
         try:
             self._logger.info("queue_name: %s", queue_name)
-            await self._mq.basic_consume(queue_name, _safe_consume)
-            await asyncio.Future()
+            self._consumers.append(await self._mq.basic_consume(queue_name, self._on_message))
+            await self._stopped.wait()
         except Exception as ex:
             self._logger.error(f"Worker crashed: {ex}")
             await asyncio.sleep(5)
             return await self.run(queue_name)
+
+    async def _consume_limited(self, queue_name: str, limit: int):
+        limiter = ConcurrencyLimiter(limit)
+        self._limiters[queue_name] = limiter
+        fixed_prefetch = settings.QUEUE_PREFETCH.get(queue_name)
+        if fixed_prefetch is not None:
+            prefetch = fixed_prefetch
+        elif settings.WORKER_ADAPTIVE_ENABLED:
+            prefetch = adaptive_prefetch(limit)
+        else:
+            prefetch = limit * settings.WORKER_PREFETCH_MULTIPLIER
+
+        # У каждой очереди свой канал, чтобы prefetch задавался независимо.
+        channel = await self._mq.new_channel()
+        controller = None
+        if settings.WORKER_ADAPTIVE_ENABLED:
+            controller = AdaptiveConcurrency(queue_name, limiter, channel, self._logger, fixed_prefetch=fixed_prefetch)
+            self._controllers[queue_name] = controller
+
+        async def _consume(message: IncomingMessage):
+            await self._on_message(message, limiter, controller)
+
+        self._consumers.append(
+            await self._mq.basic_consume(
+                queue_name, _consume, prefetch_count=prefetch, channel=channel, global_qos=controller is not None,
+            )
+        )
+        if controller is not None:
+            self._controller_tasks.append(asyncio.create_task(controller.run()))
+        self._logger.info("Queue %s: concurrency=%d prefetch=%d", queue_name, limit, prefetch)
+
+    async def run_pool(self, queue_names: list[str]):
+        try:
+            weights = {name: settings.WORKER_PRIORITY_WEIGHTS.get(name, 1) for name in queue_names}
+            capacity = split_capacity(settings.WORKER_CONCURRENCY, weights)
+            for queue_name in queue_names:
+                await self._consume_limited(queue_name, capacity[queue_name])
+            await self._stopped.wait()
+        except Exception as ex:
+            self._logger.error(f"Worker pool crashed: {ex}")
+            await asyncio.sleep(5)
+            return await self.run_pool(queue_names)
+
+    async def run_fair(self, queue_names: list[str]):
+        """Один общий пул слотов на все очереди, порядок выдачи - по старению (AgingDispatcher)."""
+        try:
+            targets = {name: settings.PRIORITY_LATENCY_TARGETS.get(name, 10.0) for name in queue_names}
+            dispatcher = AgingDispatcher(settings.WORKER_CONCURRENCY, targets)
+            # Каждой очереди нужен локальный запас сообщений, иначе диспетчеру не из чего выбирать.
+            default_prefetch = settings.WORKER_CONCURRENCY * settings.WORKER_PREFETCH_MULTIPLIER
+            for queue_name in queue_names:
+                slot = dispatcher.slot(queue_name)
+                prefetch = settings.QUEUE_PREFETCH.get(queue_name, default_prefetch)
+
+                async def _consume(message: IncomingMessage, slot: DispatcherSlot = slot):
+                    await self._on_message(message, slot)
+
+                channel = await self._mq.new_channel()
+                self._consumers.append(
+                    await self._mq.basic_consume(queue_name, _consume, prefetch_count=prefetch, channel=channel)
+                )
+                self._logger.info("Queue %s: target wait=%.1fs prefetch=%d", queue_name, targets[queue_name], prefetch)
+            await self._stopped.wait()
+        except Exception as ex:
+            self._logger.error(f"Fair worker crashed: {ex}")
+            await asyncio.sleep(5)
+            return await self.run_fair(queue_names)
+
+    async def shutdown(self, timeout: float = settings.WORKER_SHUTDOWN_TIMEOUT):
+        if self._stopping:
+            return
+        self._stopping = True
+        self._logger.info("Worker shutting down, in-flight=%d", self._in_flight)
+
+        for task in self._controller_tasks:
+            task.cancel()
+
+        for queue, consumer_tag in self._consumers:
+            try:
+                await queue.cancel(consumer_tag)
+            except Exception as ex:
+                self._logger.warning("Failed to cancel consumer %s: %s", consumer_tag, ex)
+
+        deadline = time.monotonic() + timeout
+        while self._in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self._in_flight:
+            self._logger.warning("Shutdown timeout, %d messages left unacked", self._in_flight)
+
+        await self._handler.close()
+        # Неподтвержденные сообщения брокер вернет в очередь при закрытии соединения.
+        await self._mq.close()
+        shutdown_cpu_executor()
+        self._stopped.set()
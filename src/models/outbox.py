@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, JSON
+from sqlalchemy import Column, String, DateTime, Boolean, JSON, Index, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 from src.models.base import Base
@@ -6,11 +6,15 @@ import uuid
 
 class Outbox(Base):
     __tablename__ = 'outbox'
+    __table_args__ = (
+        Index("ix_outbox_unsent", "created_at", postgresql_where=text("NOT sent")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     aggregate_type = Column(String(50), nullable=False)
     aggregate_id = Column(PG_UUID(as_uuid=True), nullable=False)
     event_type = Column(String(100), nullable=False)
     payload = Column(JSON, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    sent = Column(Boolean, default=False, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    sent = Column(Boolean, default=False, nullable=False)
     sent_at = Column(DateTime(timezone=True), nullable=True)
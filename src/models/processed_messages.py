@@ -0,0 +1,9 @@
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.sql import func
+from src.models.base import Base
+
+class ProcessedMessage(Base):
+    __tablename__ = 'processed_messages'
+    id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    processed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
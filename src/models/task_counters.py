@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, Enum, SmallInteger
+from src.models.base import Base
+from src.models.tasks import Priority, Status
+
+class TaskCounter(Base):
+    __tablename__ = 'task_counters'
+    # Ключ - (status, priority, shard); унаследованная от Base колонка id здесь не нужна.
+    id = None
+    status = Column(Enum(Status), primary_key=True)
+    priority = Column(Enum(Priority), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    count = Column(BigInteger, nullable=False, default=0)
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, String, DateTime, Text, Enum
+from sqlalchemy import Column, String, DateTime, Text, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from src.models.base import Base
@@ -18,10 +18,29 @@ class Status(str, enum.Enum):
     FAILED = "FAILED"
     CANCELLED = "CANCELLED"
 
+DEFAULT_TASK_TYPE = "default"
+
+TERMINAL_STATUSES = (Status.COMPLETED, Status.FAILED, Status.CANCELLED)
+
+# Для каждого целевого статуса - из каких статусов в него можно перейти.
+ALLOWED_TRANSITIONS: dict[Status, tuple[Status, ...]] = {
+    Status.PENDING: (Status.NEW,),
+    Status.IN_PROGRESS: (Status.NEW, Status.PENDING),
+    Status.COMPLETED: (Status.NEW, Status.PENDING, Status.IN_PROGRESS),
+    Status.FAILED: (Status.NEW, Status.PENDING, Status.IN_PROGRESS),
+    Status.CANCELLED: (Status.NEW, Status.PENDING, Status.IN_PROGRESS, Status.CANCELLED),
+}
+
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        Index("ix_tasks_created_id", "created_at", "id"),
+        Index("ix_tasks_status_created_id", "status", "created_at", "id"),
+        Index("ix_tasks_priority_created_id", "priority", "created_at", "id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
+    type = Column(String(50), default=DEFAULT_TASK_TYPE, server_default=DEFAULT_TASK_TYPE, nullable=False)
     description = Column(Text)
     priority = Column(Enum(Priority), default=Priority.MEDIUM, nullable=False)
     status = Column(Enum(Status), default=Status.NEW, nullable=False, index=True)
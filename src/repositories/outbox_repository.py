@@ -1,4 +1,6 @@
+from sqlalchemy import select, func, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.settings import settings
 from src.models.outbox import Outbox
 
 class OutboxRepository:
@@ -10,4 +12,17 @@ class OutboxRepository:
             payload=payload,
         )
         db.add(ev)
+        # NOTIFY доставляется только после коммита транзакции, а одинаковые
+        # уведомления в рамках одной транзакции Postgres склеивает в одно.
+        await db.execute(select(func.pg_notify(settings.OUTBOX_NOTIFY_CHANNEL, aggregate_type)))
         return ev
+
+    async def add_events(self, db: AsyncSession, aggregate_type: str, events: list[dict]):
+        """Пачка событий одним многострочным INSERT; events - словари с aggregate_id, event_type и payload."""
+        if not events:
+            return
+        await db.execute(
+            insert(Outbox),
+            [{"aggregate_type": aggregate_type, **event} for event in events],
+        )
+        await db.execute(select(func.pg_notify(settings.OUTBOX_NOTIFY_CHANNEL, aggregate_type)))
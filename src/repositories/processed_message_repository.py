@@ -0,0 +1,39 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.application_exceptions import DatabaseException
+from src.models.processed_messages import ProcessedMessage
+
+
+class ProcessedMessageRepository:
+    async def find_processed(self, db: AsyncSession, ids: list[UUID], since: datetime) -> set[UUID]:
+        try:
+            q = await db.execute(
+                select(ProcessedMessage.id)
+                .where(ProcessedMessage.id.in_(ids), ProcessedMessage.processed_at >= since)
+            )
+            return set(q.scalars().all())
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка чтения обработанных сообщений", cause=e)
+
+    async def mark_processed(self, db: AsyncSession, ids: list[UUID]) -> None:
+        if not ids:
+            return
+        try:
+            # Сортировка - чтобы параллельные воркеры брали блокировки в одном порядке.
+            stmt = insert(ProcessedMessage).values([{"id": message_id} for message_id in sorted(set(ids))])
+            await db.execute(stmt.on_conflict_do_nothing(index_elements=[ProcessedMessage.id]))
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка записи обработанных сообщений", cause=e)
+
+    async def delete_expired(self, db: AsyncSession, before: datetime) -> int:
+        try:
+            q = await db.execute(delete(ProcessedMessage).where(ProcessedMessage.processed_at < before))
+            return q.rowcount
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка очистки обработанных сообщений", cause=e)
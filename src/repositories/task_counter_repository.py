@@ -0,0 +1,57 @@
+import random
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.application_exceptions import DatabaseException
+from src.core.settings import settings
+from src.models.task_counters import TaskCounter
+from src.models.tasks import Priority, Status
+
+
+class TaskCounterRepository:
+    """Счетчики задач по (status, priority), разложенные на shards строк.
+
+    Каждая транзакция пишет в случайный шард, поэтому конкурентные создания и переходы
+    не ждут друг друга на одной строке до коммита; count суммирует шарды.
+    """
+
+    def __init__(self, enabled: bool = settings.TASK_COUNTERS_ENABLED, shards: int = settings.TASK_COUNTER_SHARDS):
+        self.enabled = enabled
+        self.shards = max(1, shards)
+
+    async def apply(self, db: AsyncSession, deltas: dict[tuple[Status, Priority], int]) -> None:
+        if not self.enabled:
+            return
+        shard = random.randrange(self.shards)
+        rows = [
+            {"status": status, "priority": priority, "shard": shard, "count": delta}
+            for (status, priority), delta in sorted(deltas.items()) if delta
+        ]
+        if not rows:
+            return
+        try:
+            # Строки сортируем, чтобы параллельные транзакции брали блокировки в одном порядке.
+            stmt = insert(TaskCounter).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[TaskCounter.status, TaskCounter.priority, TaskCounter.shard],
+                set_={"count": TaskCounter.count + stmt.excluded.count},
+            )
+            await db.execute(stmt)
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка обновления счетчиков задач", cause=e)
+
+    async def count(self, db: AsyncSession, *, priority: Optional[str] = None, status: Optional[str] = None) -> int:
+        try:
+            stmt = select(func.coalesce(func.sum(TaskCounter.count), 0))
+            if priority:
+                stmt = stmt.where(TaskCounter.priority == priority)
+            if status:
+                stmt = stmt.where(TaskCounter.status == status)
+            q = await db.execute(stmt)
+            return int(q.scalar_one())
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка чтения счетчиков задач", cause=e)
@@ -1,11 +1,114 @@
-from sqlalchemy import select, func
+import json
+
+from functools import lru_cache
+
+from sqlalchemy import select, func, update, insert, any_, bindparam, tuple_, text, Text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.tasks import Task
+from src.models.tasks import Task, Status, Priority, ALLOWED_TRANSITIONS, TERMINAL_STATUSES
+from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import AsyncIterator, Optional
 from sqlalchemy.exc import SQLAlchemyError
 from src.core.application_exceptions import DatabaseException
+from src.core.settings import settings
+
+# Колонки, из которых строится TaskRead: читаем их как mappings, минуя ORM-гидратацию и identity map.
+TASK_READ_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.type,
+    Task.description,
+    Task.priority,
+    Task.status,
+    Task.created_at,
+    Task.started_at,
+    Task.finished_at,
+    Task.result,
+    Task.error,
+)
+
+# Горячие запросы строятся один раз (по варианту фильтров), на вызове остается только
+# подстановка параметров; ключ кэша компиляции SQLAlchemy у готового объекта уже посчитан.
+_GET_TASK = select(Task).where(Task.id == bindparam("task_id"))
+_GET_TASK_ROW = select(*TASK_READ_COLUMNS).where(Task.id == bindparam("task_id"))
+
+
+def _transition_values(new_status: Status) -> dict:
+    values = {"status": new_status}
+    if new_status in (Status.IN_PROGRESS, Status.COMPLETED, Status.FAILED):
+        values["started_at"] = func.coalesce(Task.started_at, func.now())
+    if new_status in TERMINAL_STATUSES:
+        values["finished_at"] = func.now()
+    return values
+
+
+def _filtered(stmt, by_priority: bool, by_status: bool):
+    if by_priority:
+        stmt = stmt.where(Task.priority == bindparam("priority"))
+    if by_status:
+        stmt = stmt.where(Task.status == bindparam("status"))
+    return stmt
+
+
+@lru_cache(maxsize=None)
+def _list_stmt(by_priority: bool, by_status: bool, keyset: bool):
+    stmt = _filtered(select(*TASK_READ_COLUMNS), by_priority, by_status)
+    if keyset:
+        # Keyset: продолжаем строго после последней строки предыдущей страницы.
+        last_row = tuple_(
+            bindparam("created_at", type_=Task.created_at.type),
+            bindparam("last_id", type_=Task.id.type),
+        )
+        stmt = stmt.where(tuple_(Task.created_at, Task.id) < last_row)
+    else:
+        stmt = stmt.offset(bindparam("skip"))
+    return stmt.order_by(Task.created_at.desc(), Task.id.desc()).limit(bindparam("limit"))
+
+
+@lru_cache(maxsize=None)
+def _count_stmt(by_priority: bool, by_status: bool):
+    return _filtered(select(func.count(Task.id)), by_priority, by_status)
+
+
+@lru_cache(maxsize=None)
+def _transition_stmt(new_status: Status, allowed_from: tuple[Status, ...]):
+    previous = (
+        select(Task.id, Task.status.label("previous_status"))
+        .where(Task.id == bindparam("task_id"), Task.status.in_(allowed_from))
+        .with_for_update()
+        .cte("previous")
+    )
+    return (
+        update(Task)
+        .where(Task.id == previous.c.id)
+        .values(**_transition_values(new_status))
+        .returning(Task, previous.c.previous_status)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@lru_cache(maxsize=None)
+def _bulk_transition_stmt(new_status: Status, allowed_from: tuple[Status, ...]):
+    previous = (
+        select(Task.id, Task.status.label("previous_status"))
+        .where(
+            Task.id == any_(bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True)))),
+            Task.status.in_(allowed_from),
+        )
+        .order_by(Task.id)
+        .with_for_update()
+        .cte("previous")
+    )
+    return (
+        update(Task)
+        .where(Task.id == previous.c.id)
+        .values(**_transition_values(new_status))
+        .returning(Task.id, previous.c.previous_status, Task.priority)
+        .execution_options(synchronize_session=False)
+    )
 
 
 class TaskRepository:
@@ -17,13 +120,72 @@ class TaskRepository:
         except SQLAlchemyError as e:
             raise DatabaseException("Ошибка сохранения задачи", cause=e)
 
+    async def create_tasks(self, db: AsyncSession, rows: list[dict]) -> list[Task]:
+        """Многострочный INSERT ... RETURNING; задачи возвращаются в порядке rows."""
+        if not rows:
+            return []
+        try:
+            stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+            q = await db.execute(stmt, rows)
+            return list(q.scalars().all())
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка сохранения задач", cause=e)
+
+    async def import_tasks(self, db: AsyncSession, rows: list[dict]) -> list[RowMapping]:
+        """INSERT ... ON CONFLICT (id) DO NOTHING: повторный импорт того же архива ничего не дублирует.
+
+        Возвращает id, status и priority только вставленных строк.
+        """
+        if not rows:
+            return []
+        try:
+            stmt = (
+                pg_insert(Task)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[Task.id])
+                .returning(Task.id, Task.status, Task.priority)
+            )
+            q = await db.execute(stmt)
+            return list(q.mappings().all())
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка импорта задач", cause=e)
+
     async def get_task(self, db: AsyncSession, task_id: UUID) -> Optional[Task]:
         try:
-            q = await db.execute(select(Task).where(Task.id == task_id))
+            q = await db.execute(_GET_TASK, {"task_id": task_id})
             return q.scalars().first()
         except SQLAlchemyError as e:
             raise DatabaseException("Ошибка чтения задачи", cause=e)
 
+    async def get_task_row(self, db: AsyncSession, task_id: UUID) -> Optional[RowMapping]:
+        try:
+            q = await db.execute(_GET_TASK_ROW, {"task_id": task_id})
+            return q.mappings().first()
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка чтения задачи", cause=e)
+
+    async def stream_tasks(
+            self,
+            db: AsyncSession,
+            *,
+            priority: Optional[str] = None,
+            status: Optional[str] = None,
+            batch_size: int = 1000,
+    ) -> AsyncIterator[list]:
+        """Отдает задачи пачками через серверный курсор; строки - Core mappings, без ORM-объектов."""
+        try:
+            stmt = select(*TASK_READ_COLUMNS)
+            if priority:
+                stmt = stmt.where(Task.priority == priority)
+            if status:
+                stmt = stmt.where(Task.status == status)
+            stmt = stmt.order_by(Task.created_at, Task.id).execution_options(yield_per=batch_size)
+            result = await db.stream(stmt)
+            async for partition in result.mappings().partitions():
+                yield partition
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка выгрузки задач", cause=e)
+
     async def list_tasks(
             self,
             db: AsyncSession,
@@ -31,26 +193,106 @@ class TaskRepository:
             skip: int = 0,
             limit: int = 20,
             priority: Optional[str] = None,
+            status: Optional[str] = None,
+            cursor: Optional[tuple[datetime, UUID]] = None,
+            with_total: bool = True,
+    ) -> tuple[list[RowMapping], Optional[int]]:
+        try:
+            params = {"priority": priority, "status": status, "limit": limit}
+            if cursor:
+                params["created_at"], params["last_id"] = cursor
+            else:
+                params["skip"] = skip
+            stmt = _list_stmt(bool(priority), bool(status), bool(cursor))
+            q = await db.execute(stmt, params)
+            tasks = q.mappings().all()
+
+            if not with_total:
+                return tasks, None
+
+            total_q = await db.execute(_count_stmt(bool(priority), bool(status)), params)
+            total = total_q.scalar_one()
+
+            return tasks, total
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка получения списка задач", cause=e)
+
+    async def transition_status(
+            self,
+            db: AsyncSession,
+            task_id: UUID,
+            new_status: Status,
+            allowed_from: Optional[tuple[Status, ...]] = None,
+    ) -> Optional[tuple[Task, Status]]:
+        """UPDATE ... WHERE id = :id AND status IN (:allowed_from) RETURNING *.
+
+        Возвращает задачу и ее предыдущий статус или None, если задачи нет
+        или ее текущий статус не допускает перехода.
+        """
+        try:
+            if allowed_from is None:
+                allowed_from = ALLOWED_TRANSITIONS[new_status]
+            q = await db.execute(_transition_stmt(new_status, tuple(allowed_from)), {"task_id": task_id})
+            row = q.first()
+            return (row[0], row[1]) if row else None
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка обновления статуса задачи", cause=e)
+
+    async def bulk_transition_status(
+            self,
+            db: AsyncSession,
+            task_ids: list[UUID],
+            new_status: Status,
+            allowed_from: Optional[tuple[Status, ...]] = None,
+    ) -> list[tuple[UUID, Status, Priority]]:
+        """Пакетный переход статуса. Возвращает (id, предыдущий статус, приоритет) обновленных задач."""
+        try:
+            if allowed_from is None:
+                allowed_from = ALLOWED_TRANSITIONS[new_status]
+            q = await db.execute(_bulk_transition_stmt(new_status, tuple(allowed_from)), {"ids": list(task_ids)})
+            return [tuple(row) for row in q.all()]
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка обновления статусов задач", cause=e)
+
+    async def estimate_count(
+            self,
+            db: AsyncSession,
+            *,
+            priority: Optional[str] = None,
             status: Optional[str] = None
-    ) -> tuple[list[Task], int]:
+    ) -> int:
         try:
-            stmt = select(Task)
+            if not priority and not status:
+                q = await db.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'tasks'::regclass"))
+                estimate = q.scalar_one_or_none()
+                if estimate is not None and estimate >= 0:
+                    return int(estimate)
+
+            stmt = select(Task.id)
             if priority:
                 stmt = stmt.where(Task.priority == priority)
             if status:
                 stmt = stmt.where(Task.status == status)
-            stmt = stmt.order_by(Task.created_at.desc()).offset(skip).limit(limit)
-            q = await db.execute(stmt)
-            tasks = q.scalars().all()
-
-            count_stmt = select(func.count(Task.id))
-            if priority:
-                count_stmt = count_stmt.where(Task.priority == priority)
-            if status:
-                count_stmt = count_stmt.where(Task.status == status)
-            total_q = await db.execute(count_stmt)
-            total = total_q.scalar_one()
+            compiled = stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+            q = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+            plan = q.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except SQLAlchemyError as e:
+            raise DatabaseException("Ошибка оценки количества задач", cause=e)
 
-            return tasks, total
+    async def notify_status_changes(self, db: AsyncSession, changes: list[tuple[UUID, Status]]) -> None:
+        """Отправляет NOTIFY о смене статусов; доставка произойдет после коммита транзакции."""
+        if not changes:
+            return
+        try:
+            stmt = text(
+                "SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload"
+            ).bindparams(bindparam("payloads", type_=ARRAY(Text)))
+            await db.execute(stmt, {
+                "channel": settings.TASK_EVENTS_CHANNEL,
+                "payloads": [f"{task_id}:{status.value}" for task_id, status in changes],
+            })
         except SQLAlchemyError as e:
-            raise DatabaseException("Ошибка получения списка задач", cause=e)
\ No newline at end of file
+            raise DatabaseException("Ошибка отправки уведомления о статусе задачи", cause=e)
@@ -1,17 +1,21 @@
-from pydantic import BaseModel, constr, ConfigDict
-from typing import Optional
+import enum
+from pydantic import BaseModel, constr, ConfigDict, Field
+from typing import Any, Optional
 from datetime import datetime
 from uuid import UUID
-from src.models.tasks import Priority, Status
+from src.core.settings import settings
+from src.models.tasks import DEFAULT_TASK_TYPE, Priority, Status
 
 class TaskCreate(BaseModel):
     title: constr(strip_whitespace=True, min_length=1, max_length=255)
-    description: Optional[str]
+    description: Optional[str] = None
     priority: Priority = Priority.MEDIUM
+    type: constr(strip_whitespace=True, min_length=1, max_length=50) = DEFAULT_TASK_TYPE
 
 class TaskRead(BaseModel):
     id: UUID
     title: str
+    type: str
     description: Optional[str]
     priority: Priority
     status: Status
@@ -22,11 +26,58 @@ class TaskRead(BaseModel):
     error: Optional[str]
     model_config = ConfigDict(from_attributes=True)
 
+class TaskBatchCreate(BaseModel):
+    # Элементы валидируются по одному в эндпоинте, чтобы одна ошибка не отклоняла всю пачку.
+    items: list[dict[str, Any]] = Field(min_length=1, max_length=settings.TASK_BATCH_MAX_SIZE)
+
+class TaskBatchItemResult(BaseModel):
+    index: int
+    created: bool
+    task: Optional[TaskRead] = None
+    error: Optional[str] = None
+
+class TaskBatchResult(BaseModel):
+    created: int
+    failed: int
+    items: list[TaskBatchItemResult]
+
+class TaskImport(BaseModel):
+    """Строка NDJSON из /tasks/export; без id и status импортируется как новая задача."""
+    id: Optional[UUID] = None
+    title: constr(strip_whitespace=True, min_length=1, max_length=255)
+    type: constr(strip_whitespace=True, min_length=1, max_length=50) = DEFAULT_TASK_TYPE
+    description: Optional[str] = None
+    priority: Priority = Priority.MEDIUM
+    status: Status = Status.PENDING
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+class TaskImportError(BaseModel):
+    line: int
+    error: str
+
+class TaskImportResult(BaseModel):
+    imported: int
+    skipped: int = 0
+    failed: int
+    errors: list[TaskImportError]
+
+class TotalMode(str, enum.Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    COUNTER = "counter"
+    NONE = "none"
+
 class TaskList(BaseModel):
     items: list[TaskRead]
-    total: int
+    total: Optional[int]
+    total_estimated: bool = False
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class DeleteTaskResponse(BaseModel):
@@ -0,0 +1,135 @@
+import math
+import random
+import re
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import Text, cast, func, literal_column
+
+from src.core.database import ASYNCPG_DSN
+from src.core.logging import get_logger
+from src.core.settings import settings
+from src.models.outbox import Outbox
+
+logger = get_logger("OutboxPartitionLeases")
+
+_COUNT_MEMBERS_SQL = """
+SELECT count(*) FROM pg_locks
+WHERE locktype = 'advisory'
+  AND granted
+  AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+  AND classid = $1::int::oid
+  AND objsubid = 2
+"""
+
+_INDEX_MODULUS = re.compile(r"%\s*(\d+)\)")
+
+
+def outbox_partition_expr(partitions: int):
+    """Номер партиции события: hashtext(aggregate_id) mod partitions."""
+    # Константы рендерятся в текст запроса, чтобы выражение совпадало с индексом.
+    return func.hashtext(cast(Outbox.aggregate_id, Text)).op("&")(literal_column("2147483647")) % literal_column(
+        str(int(partitions))
+    )
+
+
+def check_partition_index(indexdef: Optional[str], partitions: int) -> None:
+    """Модуль в ix_outbox_unsent_partition должен совпадать с модулем outbox_partition_expr.
+
+    Иначе запросы по арендованным партициям молча перестают попадать в индекс
+    и каждый опрос просматривает outbox целиком.
+    """
+    match = _INDEX_MODULUS.search(indexdef or "")
+    if match is None or int(match.group(1)) != partitions:
+        raise RuntimeError(
+            f"Индекс ix_outbox_unsent_partition не совпадает с OUTBOX_PARTITIONS={partitions}: {indexdef}. "
+            "Пересоздайте индекс с новым модулем"
+        )
+
+
+class OutboxPartitionLeases:
+    """Распределяет хэш-партиции outbox между экземплярами relay через advisory-локи.
+
+    Каждый экземпляр держит локи на отдельном соединении: при его остановке или
+    падении Postgres снимает их сам, и оставшиеся экземпляры забирают партиции
+    на следующей перебалансировке.
+    """
+
+    def __init__(self, partitions: int = settings.OUTBOX_PARTITIONS, dsn: str = ASYNCPG_DSN):
+        self.partitions = partitions
+        self._dsn = dsn
+        self._member_key = random.randint(1, 2**31 - 1)
+        self._conn: Optional[asyncpg.Connection] = None
+        self._owned: set[int] = set()
+
+    @property
+    def owned(self) -> list[int]:
+        return sorted(self._owned)
+
+    @property
+    def owns_all(self) -> bool:
+        return len(self._owned) == self.partitions
+
+    async def _connect(self):
+        self._owned = set()
+        self._conn = await asyncpg.connect(self._dsn)
+        self._conn.add_termination_listener(self._on_terminated)
+        await self._conn.execute(
+            "SELECT pg_advisory_lock($1, $2)", settings.OUTBOX_MEMBERS_LOCK_NS, self._member_key
+        )
+        logger.info("Joined outbox relay group as member %d", self._member_key)
+
+    async def verify_partition_index(self):
+        """Проверяется при старте relay; при несовпадении модуля индекса relay не запускается."""
+        if self._conn is None or self._conn.is_closed():
+            await self._connect()
+        indexdef = await self._conn.fetchval(
+            "SELECT pg_get_indexdef(to_regclass('ix_outbox_unsent_partition'))"
+        )
+        check_partition_index(indexdef, self.partitions)
+
+    def _on_terminated(self, conn):
+        logger.warning("Lease connection terminated, all partitions released")
+        self._conn = None
+        self._owned = set()
+
+    async def rebalance(self) -> list[int]:
+        if self._conn is None or self._conn.is_closed():
+            await self._connect()
+
+        members = await self._conn.fetchval(_COUNT_MEMBERS_SQL, settings.OUTBOX_MEMBERS_LOCK_NS)
+        share = math.ceil(self.partitions / max(1, members))
+
+        while len(self._owned) > share:
+            partition = max(self._owned)
+            await self._conn.execute("SELECT pg_advisory_unlock($1, $2)", settings.OUTBOX_PARTITION_LOCK_NS, partition)
+            self._owned.discard(partition)
+
+        if len(self._owned) < share:
+            # Начинаем с разных смещений, чтобы экземпляры не конкурировали за одни и те же партиции.
+            start = self._member_key % self.partitions
+            for i in range(self.partitions):
+                if len(self._owned) >= share:
+                    break
+                partition = (start + i) % self.partitions
+                if partition in self._owned:
+                    continue
+                acquired = await self._conn.fetchval(
+                    "SELECT pg_try_advisory_lock($1, $2)", settings.OUTBOX_PARTITION_LOCK_NS, partition
+                )
+                if acquired:
+                    self._owned.add(partition)
+
+        logger.debug("Outbox relay members=%d share=%d owned=%s", members, share, self.owned)
+        return self.owned
+
+    async def close(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.close()
+        except Exception:
+            logger.exception("Error closing lease connection")
+        finally:
+            self._conn = None
+            self._owned = set()
@@ -1,26 +1,58 @@
 import asyncio
-import json
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import select, update, func, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 import aio_pika
+from src.infra.mq.envelope import encode_message
 from src.core.settings import settings
 from src.models.outbox import Outbox
 from src.core.database import async_session_maker
+from src.core.metrics import metrics, report_metrics_periodically
+from src.infra.mq.client import MessageQueueClientAsync
+from src.infra.mq.publisher import PublisherPool
+from src.infra.pg.listener import PgNotificationListener
+from src.services.outbox_leases import OutboxPartitionLeases, outbox_partition_expr
 
 from src.core.logging import get_logger
 
 logger = get_logger("Outbox_publisher")
 
+published_total = metrics.counter("outbox.published_total")
+failed_total = metrics.counter("outbox.publish_failed_total")
+publish_rate = metrics.gauge("outbox.published_per_second")
+publish_lag = metrics.histogram("outbox.create_to_publish_seconds")
+
+
+# Запрос выборки строится один раз, а не на каждом опросе релея.
+_CLAIM_BATCH = (
+    select(Outbox.id, Outbox.aggregate_id, Outbox.event_type, Outbox.payload, Outbox.created_at)
+    .where(Outbox.sent.is_(False))
+    .order_by(Outbox.created_at)
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True)
+)
+
+
+@lru_cache(maxsize=1)
+def _claim_partitions_stmt():
+    return _CLAIM_BATCH.where(
+        outbox_partition_expr(settings.OUTBOX_PARTITIONS).in_(bindparam("partitions", expanding=True))
+    )
+
+
 class OutboxPublisher:
     def __init__(self):
-        self.conn: Optional[aio_pika.RobustConnection] = None
-        self.channel: Optional[aio_pika.abc.AbstractChannel] = None
+        self.publisher: Optional[PublisherPool] = None
 
     async def start(self):
-        self.conn = await aio_pika.connect_robust(settings.RABBITMQ_URL)
-        self.channel = await self.conn.channel()
+        # Общее с прямыми публикациями соединение и пул каналов с подтверждениями.
+        mq = MessageQueueClientAsync.get_instance()
+        await mq.configure()
+        self.publisher = mq.publisher
 
     async def publish_outbox_once(self, limit: int = 10):
         async with async_session_maker() as db:
@@ -33,25 +65,158 @@ class OutboxPublisher:
                 )
                 rows = q.scalars().all()
                 for row in rows:
-                    priority = row.payload.get('payload', {}).get('priority', 'medium').lower()
                     logger.info(f"row.payload {row.payload}")
-                    msg = aio_pika.Message(
-                        body=json.dumps(row.payload).encode(),
-                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-                    )
-                    await self.channel.default_exchange.publish(msg, routing_key=priority)
+                    msg, priority = self._build_message(row)
+                    await self.publisher.publish(msg, routing_key=priority)
                     row.sent = True
                     row.sent_at = datetime.now()
                 await db.commit()
 
+    @staticmethod
+    def _build_message(row) -> tuple[aio_pika.Message, str]:
+        priority = row.payload.get('payload', {}).get('priority', 'medium').lower()
+        body, content_type, headers = encode_message(row.payload, row.event_type)
+        msg = aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            headers=headers,
+            # Стабильный id события: по нему воркеры отсеивают повторные доставки.
+            message_id=str(row.id),
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        )
+        return msg, priority
+
+    async def _publish_chain(self, rows) -> list:
+        """События одной задачи по порядку; после первой неудачи остальные не отправляются,
+        чтобы при повторе они ушли после нее, а не раньше и не дважды."""
+        confirmed = []
+        for row in rows:
+            msg, priority = self._build_message(row)
+            try:
+                await self.publisher.publish(msg, routing_key=priority, key=row.aggregate_id)
+            except Exception as e:
+                logger.warning("Outbox event %s was not confirmed: %s", row.id, e)
+                break
+            confirmed.append(row.id)
+        return confirmed
+
+    async def publish_outbox_batch(
+            self,
+            limit: int = settings.OUTBOX_BATCH_SIZE,
+            partitions: Optional[list[int]] = None,
+    ) -> int:
+        started = time.perf_counter()
+        if partitions is None:
+            stmt, params = _CLAIM_BATCH, {"limit": limit}
+        else:
+            stmt, params = _claim_partitions_stmt(), {"limit": limit, "partitions": partitions}
+
+        async with async_session_maker() as db:
+            async with db.begin():
+                q = await db.execute(stmt, params)
+                rows = q.all()
+                if not rows:
+                    return 0
+
+                chains: dict = {}
+                for row in rows:
+                    chains.setdefault(row.aggregate_id, []).append(row)
+                # Разные задачи публикуются конвейером, события одной задачи - по очереди.
+                published = await asyncio.gather(*(self._publish_chain(chain) for chain in chains.values()))
+                confirmed = [event_id for chain in published for event_id in chain]
+
+                if confirmed:
+                    await db.execute(
+                        update(Outbox)
+                        .where(Outbox.id == any_(bindparam("ids", confirmed, type_=ARRAY(PG_UUID(as_uuid=True)))))
+                        .values(sent=True, sent_at=func.now())
+                    )
+
+        elapsed = time.perf_counter() - started
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            if row.created_at is not None:
+                publish_lag.observe((now - row.created_at).total_seconds())
+        published_total.inc(len(confirmed))
+        failed_total.inc(len(rows) - len(confirmed))
+        rate = len(confirmed) / elapsed if elapsed > 0 else float(len(confirmed))
+        publish_rate.set(rate)
+        logger.info(
+            "Outbox batch: published=%d failed=%d in %.3fs (%.0f rows/s), lag p50=%s p95=%s",
+            len(confirmed),
+            len(rows) - len(confirmed),
+            elapsed,
+            rate,
+            publish_lag.percentile(0.5),
+            publish_lag.percentile(0.95),
+        )
+        return len(rows)
+
+
+async def _drain(publisher: OutboxPublisher, mode: str, leases: Optional[OutboxPartitionLeases] = None) -> int:
+    if mode != "batch":
+        await publisher.publish_outbox_once()
+        return 0
+
+    partitions = None
+    if leases is not None:
+        if not leases.owned:
+            return 0
+        if not leases.owns_all:
+            partitions = leases.owned
+
+    total = 0
+    # Пока выбирается полная пачка, в очереди есть еще строки - не ждем.
+    while True:
+        count = await publisher.publish_outbox_batch(partitions=partitions)
+        total += count
+        if count < settings.OUTBOX_BATCH_SIZE:
+            return total
+
 
-async def start_outbox_publisher(poll_interval: float = 1.0):
-    poll_interval = float(poll_interval)
+async def start_outbox_publisher(mode: str = settings.OUTBOX_PUBLISH_MODE):
     publisher = OutboxPublisher()
     await publisher.start()
-    while True:
-        try:
-            await publisher.publish_outbox_once()
-        except Exception as e:
-            logger.exception("Outbox publisher error: %s", e)
-        await asyncio.sleep(poll_interval)
+
+    wakeup = asyncio.Event()
+    listener = PgNotificationListener(settings.OUTBOX_NOTIFY_CHANNEL, lambda _payload: wakeup.set())
+    leases = OutboxPartitionLeases() if mode == "batch" and settings.OUTBOX_PARTITIONS > 1 else None
+    reporter = asyncio.create_task(report_metrics_periodically(logger, settings.OUTBOX_METRICS_INTERVAL))
+    delay = settings.OUTBOX_POLL_MIN_INTERVAL
+    last_rebalance = 0.0
+    try:
+        if leases is not None:
+            await leases.verify_partition_index()
+        while True:
+            if not listener.is_connected:
+                try:
+                    await listener.start()
+                except Exception as e:
+                    logger.warning("LISTEN unavailable, falling back to polling: %s", e)
+
+            if leases is not None and time.monotonic() - last_rebalance >= settings.OUTBOX_REBALANCE_INTERVAL:
+                try:
+                    await leases.rebalance()
+                    last_rebalance = time.monotonic()
+                except Exception as e:
+                    logger.warning("Outbox partition rebalance failed: %s", e)
+
+            wakeup.clear()
+            try:
+                if await _drain(publisher, mode, leases):
+                    delay = settings.OUTBOX_POLL_MIN_INTERVAL
+            except Exception as e:
+                logger.exception("Outbox publisher error: %s", e)
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=delay)
+                delay = settings.OUTBOX_POLL_MIN_INTERVAL
+                # Даем пачке уведомлений догнать друг друга и разбираем их одним проходом.
+                await asyncio.sleep(settings.OUTBOX_NOTIFY_COALESCE)
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, settings.OUTBOX_POLL_MAX_INTERVAL, settings.OUTBOX_REBALANCE_INTERVAL)
+    finally:
+        reporter.cancel()
+        await listener.close()
+        if leases is not None:
+            await leases.close()
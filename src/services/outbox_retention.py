@@ -0,0 +1,203 @@
+import asyncio
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.core.database import async_session_maker
+from src.core.logging import get_logger
+from src.core.metrics import metrics
+from src.core.settings import settings
+from src.repositories.processed_message_repository import ProcessedMessageRepository
+
+logger = get_logger("Outbox_retention")
+
+_PARTITION_NAME = re.compile(r"^outbox_p(\d{8})$")
+
+backlog_rows = metrics.gauge("outbox.backlog_rows")
+oldest_unsent_age = metrics.gauge("outbox.oldest_unsent_seconds")
+dead_tuples = metrics.gauge("outbox.dead_tuples")
+dead_tuple_ratio = metrics.gauge("outbox.dead_tuple_ratio")
+total_bytes = metrics.gauge("outbox.total_bytes")
+partitions_dropped = metrics.counter("outbox.partitions_dropped_total")
+default_rows_moved = metrics.counter("outbox.default_rows_moved_total")
+processed_expired = metrics.counter("worker.dedup.expired_total")
+
+
+def partition_name(day: date) -> str:
+    return f"outbox_p{day:%Y%m%d}"
+
+
+class OutboxRetention:
+    """Обслуживает дневные партиции outbox: создает будущие и удаляет или архивирует старые целиком."""
+
+    def __init__(
+            self,
+            retention_days: int = settings.OUTBOX_RETENTION_DAYS,
+            ahead_days: int = settings.OUTBOX_PARTITIONS_AHEAD,
+            mode: str = settings.OUTBOX_RETENTION_MODE,
+            detach_lock_timeout_ms: int = settings.OUTBOX_DETACH_LOCK_TIMEOUT_MS,
+    ):
+        self.retention_days = retention_days
+        self.ahead_days = ahead_days
+        self.mode = mode
+        self.detach_lock_timeout_ms = detach_lock_timeout_ms
+
+    async def _create_partition(self, db, day: date) -> int:
+        """Создает партицию за день, перенося в нее строки этого дня из default-партиции.
+
+        Пока в default лежат строки за день, Postgres не дает создать для него партицию,
+        поэтому таблица создается отдельно, заполняется и только потом подключается.
+        Возвращает число перенесенных строк.
+        """
+        name = partition_name(day)
+        bounds = (
+            f"FROM ('{day.isoformat()} 00:00:00+00') "
+            f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+        )
+        async with db.begin():
+            exists = await db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+            if exists.scalar_one():
+                return 0
+            # Блокируем вставки в default, чтобы до ATTACH туда не попали новые строки за этот день.
+            await db.execute(text("LOCK TABLE outbox_default IN SHARE ROW EXCLUSIVE MODE"))
+            await db.execute(text(f"CREATE TABLE {name} (LIKE outbox INCLUDING DEFAULTS)"))
+            moved = await db.execute(text(
+                f"WITH moved AS ("
+                f"DELETE FROM outbox_default WHERE created_at >= '{day.isoformat()} 00:00:00+00' "
+                f"AND created_at < '{(day + timedelta(days=1)).isoformat()} 00:00:00+00' RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            ))
+            await db.execute(text(f"ALTER TABLE outbox ATTACH PARTITION {name} FOR VALUES {bounds}"))
+        if moved.rowcount:
+            default_rows_moved.inc(moved.rowcount)
+            logger.warning("Moved %d outbox rows from default partition into %s", moved.rowcount, name)
+        return moved.rowcount
+
+    async def ensure_partitions(self, today: date) -> None:
+        async with async_session_maker() as db:
+            for offset in range(self.ahead_days + 1):
+                day = today + timedelta(days=offset)
+                try:
+                    await self._create_partition(db, day)
+                except SQLAlchemyError as e:
+                    logger.error("Failed to create outbox partition for %s: %s", day, e)
+
+    async def rehome_default_rows(self) -> list[date]:
+        """Раскладывает строки из default-партиции по дневным партициям.
+
+        В default строки попадают, только если партиции за их день не было; после
+        переноса они удаляются или архивируются вместе со своей партицией.
+        """
+        async with async_session_maker() as db:
+            async with db.begin():
+                q = await db.execute(text(
+                    "SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::date FROM outbox_default"
+                ))
+                days = sorted(row[0] for row in q.all())
+
+            for day in days:
+                try:
+                    await self._create_partition(db, day)
+                except SQLAlchemyError as e:
+                    logger.error("Failed to move default outbox rows for %s: %s", day, e)
+        return days
+
+    async def expire_partitions(self, today: date) -> list[str]:
+        cutoff = today - timedelta(days=self.retention_days)
+        expired = []
+        async with async_session_maker() as db:
+            async with db.begin():
+                q = await db.execute(text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'outbox'::regclass"
+                ))
+                names = [row[0] for row in q.all()]
+
+            for name in sorted(names):
+                match = _PARTITION_NAME.match(name)
+                if not match:
+                    continue
+                day = datetime.strptime(match.group(1), "%Y%m%d").date()
+                if day >= cutoff:
+                    continue
+
+                # DETACH ... CONCURRENTLY недоступен, пока у outbox есть default-партиция, а обычный
+                # DETACH берет ACCESS EXCLUSIVE на outbox. Держим его только на время DETACH и DROP
+                # пустой по неотправленным партиции, а ждать блокировку дольше lock_timeout не даем:
+                # иначе relay и вставки встали бы в очередь за ним. Не дождались - удалим в следующий прогон.
+                try:
+                    async with db.begin():
+                        await db.execute(text(f"SET LOCAL lock_timeout = {int(self.detach_lock_timeout_ms)}"))
+                        unsent = await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE NOT sent)"))
+                        if unsent.scalar_one():
+                            logger.warning("Partition %s still has unsent events, keeping it", name)
+                            continue
+
+                        await db.execute(text(f"ALTER TABLE outbox DETACH PARTITION {name}"))
+                        if self.mode == "archive":
+                            await db.execute(text(f"ALTER TABLE {name} RENAME TO outbox_archive_{match.group(1)}"))
+                        else:
+                            await db.execute(text(f"DROP TABLE {name}"))
+                except SQLAlchemyError as e:
+                    logger.warning("Could not detach outbox partition %s, retrying next run: %s", name, e)
+                    continue
+
+                expired.append(name)
+                partitions_dropped.inc()
+                logger.info("Outbox partition %s %s", name, "archived" if self.mode == "archive" else "dropped")
+        return expired
+
+    async def expire_processed_messages(self) -> int:
+        """Чистит отметки об обработанных сообщениях старше окна дедупликации."""
+        before = datetime.now(timezone.utc) - timedelta(seconds=settings.DEDUP_TTL)
+        async with async_session_maker() as db:
+            async with db.begin():
+                deleted = await ProcessedMessageRepository().delete_expired(db, before)
+        processed_expired.inc(deleted)
+        return deleted
+
+    async def collect_metrics(self) -> dict:
+        async with async_session_maker() as db:
+            backlog = await db.execute(text(
+                "SELECT count(*), extract(epoch FROM now() - min(created_at)) FROM outbox WHERE NOT sent"
+            ))
+            count, oldest = backlog.one()
+            stats = await db.execute(text(
+                "SELECT coalesce(sum(s.n_dead_tup), 0), coalesce(sum(s.n_live_tup), 0), "
+                "coalesce(sum(pg_total_relation_size(s.relid)), 0) "
+                "FROM pg_stat_user_tables s "
+                "JOIN pg_inherits i ON i.inhrelid = s.relid "
+                "WHERE i.inhparent = 'outbox'::regclass"
+            ))
+            dead, live, size = stats.one()
+
+        backlog_rows.set(count)
+        oldest_unsent_age.set(oldest or 0)
+        dead_tuples.set(dead)
+        dead_tuple_ratio.set(dead / (dead + live) if dead + live else 0)
+        total_bytes.set(size)
+        return {"backlog": count, "oldest_unsent_seconds": oldest, "dead_tuples": dead, "live_tuples": live, "bytes": size}
+
+    async def run_once(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        await self.ensure_partitions(today)
+        await self.rehome_default_rows()
+        await self.expire_partitions(today)
+        if settings.DEDUP_ENABLED:
+            deleted = await self.expire_processed_messages()
+            logger.info("Expired %d processed message marks", deleted)
+        stats = await self.collect_metrics()
+        logger.info("Outbox retention stats: %s", stats)
+
+
+async def start_outbox_retention(interval: float = settings.OUTBOX_RETENTION_INTERVAL):
+    retention = OutboxRetention()
+    while True:
+        try:
+            await retention.run_once()
+        except Exception as e:
+            logger.exception("Outbox retention error: %s", e)
+        await asyncio.sleep(interval)
@@ -1,5 +1,6 @@
-from typing import List, Optional
-from uuid import UUID
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.application_exceptions import DatabaseException
@@ -7,8 +8,10 @@ from src.core.transport_exceptions import NotFoundException, BadRequestException
 from src.core.uow import UnitOfWork
 from src.repositories.task_repository import TaskRepository
 from src.repositories.outbox_repository import OutboxRepository
-from src.schemas.tasks_schemas import TaskCreate
-from src.models.tasks import Task, Status
+from src.repositories.task_counter_repository import TaskCounterRepository
+from src.schemas.tasks_schemas import TaskCreate, TaskImport, TaskRead, TotalMode
+from src.infra.cache.task_cache import TaskCache
+from src.models.tasks import Task, Status, Priority, TERMINAL_STATUSES
 from src.core.exceptions import (
     CreateTaskException,
     GetTaskException,
@@ -19,22 +22,44 @@ from src.core.exceptions import (
 )
 
 class TaskService:
-    def __init__(self, task_repo: TaskRepository, outbox_repo: OutboxRepository, uow: UnitOfWork):
+    def __init__(
+            self,
+            task_repo: TaskRepository,
+            outbox_repo: OutboxRepository,
+            uow: UnitOfWork,
+            counter_repo: Optional[TaskCounterRepository] = None,
+            cache: Optional[TaskCache] = None,
+            read_uow: Optional[UnitOfWork] = None,
+    ):
         self.task_repo = task_repo
         self.outbox_repo = outbox_repo
         self.uow = uow
+        self.counter_repo = counter_repo or TaskCounterRepository()
+        self.cache = cache
+        # Только для чтений, которые переживут отставание реплики.
+        self.read_uow = read_uow or uow
+
+    @staticmethod
+    def _counter_deltas(changes: list[tuple[Status, Status, Priority]]) -> dict[tuple[Status, Priority], int]:
+        deltas: dict[tuple[Status, Priority], int] = {}
+        for previous_status, new_status, priority in changes:
+            deltas[(previous_status, priority)] = deltas.get((previous_status, priority), 0) - 1
+            deltas[(new_status, priority)] = deltas.get((new_status, priority), 0) + 1
+        return deltas
 
     async def create_task(self, payload: TaskCreate) -> Task:
         try:
             async with self.uow as uow:
                 task = Task(
                     title=payload.title,
+                    type=payload.type,
                     description=payload.description,
                     priority=payload.priority,
                     status=Status.PENDING,
                 )
 
                 task = await self.task_repo.create_task(uow.db, task)
+                await self.counter_repo.apply(uow.db, {(task.status, task.priority): 1})
                 await self.outbox_repo.add_event(
                     uow.db,
                     aggregate_type="task",
@@ -50,51 +75,187 @@ class TaskService:
         except Exception as e:
              raise CreateTaskException(cause=e) from e
 
+    async def create_tasks(self, payloads: list[TaskCreate]) -> list[Task]:
+        """Создает пачку задач и их события outbox в одной транзакции."""
+        if not payloads:
+            return []
+        try:
+            async with self.uow as uow:
+                # id генерируем на клиенте, чтобы события outbox не ждали RETURNING.
+                rows = [
+                    {
+                        "id": uuid4(),
+                        "title": payload.title,
+                        "type": payload.type,
+                        "description": payload.description,
+                        "priority": payload.priority,
+                        "status": Status.PENDING,
+                    }
+                    for payload in payloads
+                ]
+                tasks = await self.task_repo.create_tasks(uow.db, rows)
+
+                deltas: dict[tuple[Status, Priority], int] = {}
+                for task in tasks:
+                    deltas[(task.status, task.priority)] = deltas.get((task.status, task.priority), 0) + 1
+                await self.counter_repo.apply(uow.db, deltas)
+
+                await self.outbox_repo.add_events(
+                    uow.db,
+                    aggregate_type="task",
+                    events=[
+                        {
+                            "aggregate_id": row["id"],
+                            "event_type": "task.created",
+                            "payload": {"task_id": str(row["id"]), "payload": payload.model_dump()},
+                        }
+                        for row, payload in zip(rows, payloads)
+                    ],
+                )
+
+                return tasks
+        except DatabaseException as e:
+            raise CreateTaskException(cause=e) from e
+        except Exception as e:
+            raise CreateTaskException(cause=e) from e
+
+    async def import_tasks(self, items: list[TaskImport]) -> int:
+        """Восстанавливает задачи из экспорта с их id, статусами и временем.
+
+        События outbox создаются только для незавершенных задач - завершенные воркерам не отправляются.
+        Возвращает число вставленных строк; уже существующие id пропускаются.
+        """
+        if not items:
+            return 0
+        try:
+            async with self.uow as uow:
+                now = datetime.now(timezone.utc)
+                rows = [
+                    {
+                        **item.model_dump(exclude={"id", "created_at"}),
+                        "id": item.id or uuid4(),
+                        "created_at": item.created_at or now,
+                    }
+                    for item in items
+                ]
+                inserted = await self.task_repo.import_tasks(uow.db, rows)
+
+                deltas: dict[tuple[Status, Priority], int] = {}
+                for row in inserted:
+                    deltas[(row["status"], row["priority"])] = deltas.get((row["status"], row["priority"]), 0) + 1
+                await self.counter_repo.apply(uow.db, deltas)
+
+                by_id = {row["id"]: item for row, item in zip(rows, items)}
+                await self.outbox_repo.add_events(
+                    uow.db,
+                    aggregate_type="task",
+                    events=[
+                        {
+                            "aggregate_id": row["id"],
+                            "event_type": "task.created",
+                            "payload": {
+                                "task_id": str(row["id"]),
+                                "payload": by_id[row["id"]].model_dump(
+                                    include={"title", "description", "priority", "type"}
+                                ),
+                            },
+                        }
+                        for row in inserted if row["status"] not in TERMINAL_STATUSES
+                    ],
+                )
+                return len(inserted)
+        except DatabaseException as e:
+            raise CreateTaskException(cause=e) from e
+        except Exception as e:
+            raise CreateTaskException(cause=e) from e
+
+    async def export_tasks(
+            self,
+            priority: Optional[str] = None,
+            status: Optional[str] = None,
+            batch_size: int = 1000,
+    ) -> AsyncIterator[list[dict]]:
+        """Пачки строк задач для потоковой выгрузки; транзакция держится, пока читается курсор."""
+        try:
+            async with self.read_uow as uow:
+                async for rows in self.task_repo.stream_tasks(
+                    uow.db, priority=priority, status=status, batch_size=batch_size
+                ):
+                    yield rows
+        except DatabaseException as e:
+            raise ListTaskException(cause=e) from e
+        except Exception as e:
+            raise ListTaskException(cause=e) from e
+
     async def list_tasks(
             self,
             page: int = 1,
             page_size: int = 20,
             priority: Optional[str] = None,
-            status: Optional[str] = None
-    ) -> tuple[list[Task], int]:
+            status: Optional[str] = None,
+            cursor: Optional[tuple[datetime, UUID]] = None,
+            total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[TaskRead], Optional[int]]:
         try:
-            async with self.uow as uow:
+            async with self.read_uow as uow:
                 skip = (page - 1) * page_size
-                tasks, total = await self.task_repo.list_tasks(
+                rows, total = await self.task_repo.list_tasks(
                     uow.db,
                     skip=skip,
                     limit=page_size,
                     priority=priority,
-                    status=status
+                    status=status,
+                    cursor=cursor,
+                    with_total=total_mode == TotalMode.EXACT,
                 )
+                if total_mode == TotalMode.COUNTER and self.counter_repo.enabled:
+                    total = await self.counter_repo.count(uow.db, priority=priority, status=status)
+                elif total_mode in (TotalMode.ESTIMATE, TotalMode.COUNTER):
+                    total = await self.task_repo.estimate_count(uow.db, priority=priority, status=status)
 
-                return tasks, total
+                # Строки уже типизированы колонками БД, повторная валидация pydantic не нужна.
+                return [TaskRead.model_construct(**row) for row in rows], total
         except DatabaseException as e:
             raise ListTaskException(cause=e) from e
         except Exception as e:
             raise ListTaskException(cause=e) from e
 
-    async def get_task(self, task_id: UUID):
-        try:
-            async with self.uow as uow:
-                task = await self.task_repo.get_task(uow.db, task_id)
+    async def _read_task(self, task_id: UUID, use_cache: bool = True) -> TaskRead:
+        if use_cache and self.cache is not None:
+            cached = await self.cache.get(task_id)
+            if cached is not None:
+                return TaskRead.model_validate(cached)
 
-                if not task:
-                    raise NotFoundException("Задача не найдена")
+        # Промах кэша и чтение в обход него (после уведомления о смене статуса) идут в основную БД:
+        # отстающая реплика вернула бы в кэш статус, уже сброшенный инвалидацией, на весь TTL.
+        # Без кэша одиночное чтение можно отдать реплике.
+        read_uow = self.read_uow if use_cache and self.cache is None else self.uow
+        async with read_uow as uow:
+            row = await self.task_repo.get_task_row(uow.db, task_id)
+            if not row:
+                raise NotFoundException("Задача не найдена")
+            data = TaskRead.model_construct(**row)
 
-                return task
+        if self.cache is not None:
+            await self.cache.set(task_id, data.model_dump(mode="json"))
+        return data
+
+    async def _invalidate(self, *task_ids: UUID):
+        if self.cache is not None and task_ids:
+            await self.cache.invalidate(*task_ids)
+
+    async def get_task(self, task_id: UUID, use_cache: bool = True) -> TaskRead:
+        try:
+            return await self._read_task(task_id, use_cache=use_cache)
         except DatabaseException as e:
             raise GetTaskException(cause=e) from e
         except Exception as e:
             raise GetTaskException(cause=e) from e
 
-    async def get_task_status(self, task_id: UUID) -> Task.status | None:
+    async def get_task_status(self, task_id: UUID, use_cache: bool = True) -> Task.status | None:
         try:
-            async with self.uow as uow:
-                task = await self.task_repo.get_task(uow.db, task_id)
-                if not task:
-                    raise NotFoundException("Задача не найдена")
-                return task.status
+            task = await self._read_task(task_id, use_cache=use_cache)
+            return task.status
         except DatabaseException as e:
             raise GetTaskStatusException(cause=e) from e
         except Exception as e:
@@ -103,14 +264,16 @@ class TaskService:
     async def delete_task(self, task_id: UUID) -> Task:
         try:
             async with self.uow as uow:
-                task = await self.task_repo.get_task(uow.db, task_id)
-                if not task:
-                    raise NotFoundException("Задача не найдена")
-
-                if task.status in (Status.COMPLETED, Status.FAILED):
+                transition = await self.task_repo.transition_status(uow.db, task_id, Status.CANCELLED)
+                if not transition:
+                    if not await self.task_repo.get_task(uow.db, task_id):
+                        raise NotFoundException("Задача не найдена")
                     raise BadRequestException("Нельзя удалить завершенную задачу")
 
-                task.status = Status.CANCELLED
+                task, previous_status = transition
+                await self.counter_repo.apply(uow.db, self._counter_deltas([(previous_status, task.status, task.priority)]))
+                await self.task_repo.notify_status_changes(uow.db, [(task_id, task.status)])
+
                 await self.outbox_repo.add_event(
                     uow.db,
                     aggregate_type="task",
@@ -119,21 +282,51 @@ class TaskService:
                     payload={"task_id": str(task_id)},
                 )
 
-                return task
+            await self._invalidate(task_id)
+            return task
         except DatabaseException as e:
             raise DeleteTaskException(cause=e) from e
         except Exception as e:
             raise DeleteTaskException(cause=e) from e
 
-    async def update_task_status(self, task_id: UUID, new_status: Status):
+    async def update_task_status(self, task_id: UUID, new_status: Status) -> Optional[Task]:
+        """Возвращает None, если переход не разрешен ALLOWED_TRANSITIONS - как и пакетный путь,
+        повторную доставку или уже отмененную задачу не считаем ошибкой."""
         try:
             async with self.uow as uow:
-                task = await self.task_repo.get_task(uow.db, task_id)
-                if not task:
-                    raise NotFoundException("Задача не найдена")
+                transition = await self.task_repo.transition_status(uow.db, task_id, new_status)
+                if not transition:
+                    if not await self.task_repo.get_task(uow.db, task_id):
+                        raise NotFoundException("Задача не найдена")
+                    return None
 
-                task.status = new_status
-                return task
+                task, previous_status = transition
+                await self.counter_repo.apply(uow.db, self._counter_deltas([(previous_status, task.status, task.priority)]))
+                await self.task_repo.notify_status_changes(uow.db, [(task_id, task.status)])
+
+            await self._invalidate(task_id)
+            return task
+
+        except DatabaseException as e:
+            raise UpdateTaskException(cause=e) from e
+        except Exception as e:
+            raise UpdateTaskException(cause=e) from e
+
+    async def update_tasks_status(self, updates: dict[Status, list[UUID]]) -> int:
+        try:
+            async with self.uow as uow:
+                changes = []
+                notifications = []
+                for new_status, task_ids in updates.items():
+                    rows = await self.task_repo.bulk_transition_status(uow.db, task_ids, new_status)
+                    changes.extend((previous_status, new_status, priority) for _, previous_status, priority in rows)
+                    notifications.extend((task_id, new_status) for task_id, _, _ in rows)
+                await self.counter_repo.apply(uow.db, self._counter_deltas(changes))
+                await self.task_repo.notify_status_changes(uow.db, notifications)
+                updated_ids = [task_id for task_id, _ in notifications]
+
+            await self._invalidate(*updated_ids)
+            return len(changes)
 
         except DatabaseException as e:
             raise UpdateTaskException(cause=e) from e
@@ -0,0 +1,71 @@
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock
+
+from src.dependencies import service as service_dependencies
+from src.infra.cache.backends import LRUCache
+from src.infra.cache.task_cache import TaskCache
+
+
+class FakeUnitOfWork:
+    """UnitOfWork без БД: считает открытые транзакции."""
+
+    db = None
+
+    def __init__(self, *args, **kwargs):
+        self.entered = 0
+
+    async def __aenter__(self):
+        self.entered += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeTaskService:
+    """Сервис задач для обработчиков и StatusBatchWriter: запоминает смены статусов.
+
+    rejected имитирует отказ guarded UPDATE: задача уже в статусе, из которого перехода нет.
+    """
+
+    def __init__(self, fail: bool = False, rejected: bool = False):
+        self.fail = fail
+        self.rejected = rejected
+        self.calls = []
+        self.updates = []
+
+    async def update_tasks_status(self, updates):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.calls.append(updates)
+        return 0 if self.rejected else sum(len(ids) for ids in updates.values())
+
+    async def update_task_status(self, task_id, status):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.updates.append(status)
+        return None if self.rejected else task_id
+
+
+@pytest.fixture
+def fake_uow() -> FakeUnitOfWork:
+    return FakeUnitOfWork()
+
+
+@pytest.fixture
+def fake_task_service():
+    """Фабрика FakeTaskService."""
+    return FakeTaskService
+
+
+@pytest_asyncio.fixture
+async def task_service(monkeypatch):
+    """TaskService, собранный get_task_service, с фейковыми UnitOfWork, репозиториями и кэшем в процессе."""
+    monkeypatch.setattr(service_dependencies, "UnitOfWork", FakeUnitOfWork)
+    monkeypatch.setattr(service_dependencies, "get_task_cache", lambda: TaskCache(LRUCache(10)))
+    service = await service_dependencies.get_task_service()
+    service.task_repo = AsyncMock()
+    service.outbox_repo = AsyncMock()
+    service.counter_repo = AsyncMock()
+    return service
@@ -0,0 +1,96 @@
+import logging
+import pytest
+from unittest.mock import AsyncMock
+
+from src.core.settings import settings
+from src.infra.tasks.adaptive import AdaptiveConcurrency, WindowStats, adaptive_prefetch
+from src.infra.tasks.limiter import ConcurrencyLimiter
+from src.infra.tasks.worker import BaseWorker
+
+
+def _controller(limiter: ConcurrencyLimiter, channel=None, **kwargs) -> AdaptiveConcurrency:
+    return AdaptiveConcurrency(
+        "test",
+        limiter,
+        channel or AsyncMock(),
+        logging.getLogger("test"),
+        min_limit=1,
+        max_limit=10,
+        target_latency=0.5,
+        max_error_rate=0.1,
+        max_pool_wait=0.05,
+        decrease_factor=0.5,
+        **kwargs,
+    )
+
+
+def test_grows_additively_only_when_saturated():
+    controller = _controller(ConcurrencyLimiter(4))
+
+    assert controller.decide(4, WindowStats(100, 0, 0.1, peak_in_flight=4, pool_wait=0.001)) == 5
+    assert controller.decide(4, WindowStats(100, 0, 0.1, peak_in_flight=2, pool_wait=0.001)) == 4
+    assert controller.decide(10, WindowStats(100, 0, 0.1, peak_in_flight=10, pool_wait=None)) == 10
+
+
+@pytest.mark.parametrize("stats", [
+    WindowStats(100, 0, 0.9, peak_in_flight=8, pool_wait=None),
+    WindowStats(100, 20, 0.1, peak_in_flight=8, pool_wait=None),
+    WindowStats(100, 0, 0.1, peak_in_flight=8, pool_wait=0.2),
+])
+def test_backs_off_multiplicatively_under_pressure(stats):
+    controller = _controller(ConcurrencyLimiter(8))
+
+    assert controller.decide(8, stats) == 4
+    assert controller.decide(1, stats) == 1
+
+
+@pytest.mark.asyncio
+async def test_adjust_updates_qos_and_limiter():
+    limiter = ConcurrencyLimiter(2)
+    channel = AsyncMock()
+    controller = _controller(limiter, channel)
+
+    await limiter.acquire()
+    await limiter.acquire()
+    controller.record(0.01, ok=True)
+    await limiter.release()
+    await limiter.release()
+
+    assert await controller.adjust() == 3
+    assert limiter.limit == 3
+    channel.set_qos.assert_awaited_once_with(prefetch_count=controller.prefetch_for(3), global_=True)
+
+
+@pytest.mark.asyncio
+async def test_fixed_prefetch_is_not_touched():
+    limiter = ConcurrencyLimiter(1)
+    channel = AsyncMock()
+    controller = _controller(limiter, channel, fixed_prefetch=50)
+
+    await limiter.acquire()
+    controller.record(0.01, ok=True)
+    await limiter.release()
+
+    assert await controller.adjust() == 2
+    channel.set_qos.assert_not_awaited()
+
+
+def test_prefetch_scales_with_limit():
+    assert adaptive_prefetch(20) == 20 * settings.WORKER_PREFETCH_MULTIPLIER
+    assert adaptive_prefetch(40) > adaptive_prefetch(20)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_queue_uses_channel_wide_qos(monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_ADAPTIVE_ENABLED", True)
+    mq = AsyncMock()
+    mq.basic_consume.return_value = (AsyncMock(), "tag")
+    worker = BaseWorker(mq, AsyncMock(), logging.getLogger("test"))
+
+    await worker._consume_limited("high", 4)
+    for task in worker._controller_tasks:
+        task.cancel()
+
+    _, kwargs = mq.basic_consume.await_args
+    assert kwargs["global_qos"] is True
+    assert kwargs["prefetch_count"] == adaptive_prefetch(4)
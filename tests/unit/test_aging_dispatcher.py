@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+
+from src.infra.tasks.scheduler import AgingDispatcher
+
+
+async def _hold(dispatcher: AgingDispatcher, queue: str, order: list[str]):
+    await dispatcher.acquire(queue)
+    order.append(queue)
+
+
+@pytest.mark.asyncio
+async def test_fresh_high_priority_goes_first():
+    dispatcher = AgingDispatcher(1, {"high": 1.0, "low": 60.0})
+    await dispatcher.acquire("high")
+    order: list[str] = []
+    low = asyncio.create_task(_hold(dispatcher, "low", order))
+    await asyncio.sleep(0.01)
+    high = asyncio.create_task(_hold(dispatcher, "high", order))
+    await asyncio.sleep(0.01)
+
+    dispatcher.release()
+    await asyncio.sleep(0)
+    assert order == ["high"]
+    dispatcher.release()
+    await asyncio.gather(low, high)
+    assert order == ["high", "low"]
+
+
+@pytest.mark.asyncio
+async def test_aged_low_priority_is_promoted():
+    dispatcher = AgingDispatcher(1, {"high": 1.0, "low": 2.0})
+    await dispatcher.acquire("high")
+    order: list[str] = []
+    low = asyncio.create_task(_hold(dispatcher, "low", order))
+    await asyncio.sleep(0.1)
+    high = asyncio.create_task(_hold(dispatcher, "high", order))
+    await asyncio.sleep(0.01)
+
+    # low ждет 0.1/2.0, high - 0.01/1.0: старение поднимает low выше.
+    dispatcher.release()
+    await asyncio.sleep(0)
+    assert order == ["low"]
+    dispatcher.release()
+    await asyncio.gather(low, high)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    dispatcher = AgingDispatcher(1, {"high": 1.0})
+    await dispatcher.acquire("high")
+    waiter = asyncio.create_task(dispatcher.acquire("high"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    dispatcher.release()
+    assert dispatcher.busy == 0
+    assert dispatcher.waiting("high") == 0
+    await asyncio.wait_for(dispatcher.acquire("high"), 1)
+    assert dispatcher.busy == 1
@@ -0,0 +1,30 @@
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from src.core.codec import JSONCodec, OrjsonCodec, orjson
+from src.models.tasks import Priority
+
+codecs = [JSONCodec()]
+if orjson is not None:
+    codecs.append(OrjsonCodec())
+
+
+@pytest.mark.parametrize("codec", codecs, ids=lambda c: c.name)
+def test_codecs_encode_domain_types_identically(codec):
+    task_id = uuid4()
+    created_at = datetime(2025, 11, 26, 23, 37, 38, tzinfo=timezone.utc)
+    payload = {"task_id": task_id, "priority": Priority.HIGH, "created_at": created_at, "title": "задача"}
+
+    assert codec.loads(codec.dumps(payload)) == {
+        "task_id": str(task_id),
+        "priority": "HIGH",
+        "created_at": "2025-11-26T23:37:38+00:00",
+        "title": "задача",
+    }
+
+
+@pytest.mark.parametrize("codec", codecs, ids=lambda c: c.name)
+def test_loads_accepts_bytes_and_memoryview(codec):
+    assert codec.loads(b'{"a":1}') == {"a": 1}
+    assert codec.loads(memoryview(b'{"a":1}')) == {"a": 1}
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import pytest
+from uuid import uuid4
+
+from src.infra.tasks.dedup import ProcessedMessageStore, parse_message_id
+
+
+class FakeRepository:
+    def __init__(self, fail: bool = False):
+        self.processed = set()
+        self.lookups = []
+        self.fail = fail
+
+    async def find_processed(self, db, ids, since):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.lookups.append(list(ids))
+        return self.processed & set(ids)
+
+    async def mark_processed(self, db, ids):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.processed.update(ids)
+
+
+def _store(repository: FakeRepository, uow) -> ProcessedMessageStore:
+    return ProcessedMessageStore(
+        logging.getLogger("test"), uow=uow, repository=repository, max_batch=10, max_delay_ms=1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_batched_and_marks_are_seen_across_stores(fake_uow):
+    repository = FakeRepository()
+    store = _store(repository, fake_uow)
+    ids = [uuid4() for _ in range(15)]
+
+    assert not any(await asyncio.gather(*(store.seen(message_id) for message_id in ids)))
+    assert [len(batch) for batch in repository.lookups] == [10, 5]
+
+    await store.mark(ids[0])
+    assert await store.seen(ids[0])
+    # Другой процесс узнает о повторе из таблицы.
+    assert await _store(repository, fake_uow).seen(ids[0])
+
+
+@pytest.mark.asyncio
+async def test_store_errors_do_not_block_processing(fake_uow):
+    store = _store(FakeRepository(fail=True), fake_uow)
+    message_id = uuid4()
+
+    assert not await store.seen(message_id)
+    await store.mark(message_id)
+    assert await store.seen(message_id)
+
+
+def test_parse_message_id():
+    message_id = uuid4()
+    assert parse_message_id(str(message_id)) == message_id
+    assert parse_message_id("not-a-uuid") is None
+    assert parse_message_id(None) is None
@@ -0,0 +1,49 @@
+import pytest
+from uuid import uuid4
+
+from src.infra.mq.envelope import (
+    CONTENT_TYPE_JSON,
+    CONTENT_TYPE_TASK_EVENT,
+    EVENT_TYPE_HEADER,
+    decode_message,
+    encode_message,
+    encode_task_event,
+)
+from src.models.tasks import Priority
+
+
+def test_binary_envelope_round_trip():
+    task_id = uuid4()
+    payload = {"task_id": str(task_id), "payload": {"title": "t", "description": None, "priority": "HIGH"}}
+
+    body, content_type, headers = encode_message(payload, "task.created", fmt="binary")
+
+    assert content_type == CONTENT_TYPE_TASK_EVENT
+    assert len(body) == 19
+    assert decode_message(body, content_type) == {
+        "task_id": task_id,
+        "event_type": "task.created",
+        "priority": Priority.HIGH,
+    }
+
+
+def test_unknown_event_falls_back_to_json():
+    payload = {"task_id": str(uuid4())}
+
+    body, content_type, headers = encode_message(payload, "task.archived", fmt="binary")
+
+    assert content_type == CONTENT_TYPE_JSON
+    assert headers == {EVENT_TYPE_HEADER: "task.archived"}
+    assert decode_message(body, content_type) == payload
+
+
+def test_messages_without_content_type_are_json():
+    assert decode_message(b'{"task_id": "x"}') == {"task_id": "x"}
+
+
+def test_unsupported_version_is_rejected():
+    body = bytearray(encode_task_event(uuid4(), "task.deleted"))
+    body[0] = 99
+
+    with pytest.raises(ValueError):
+        decode_message(bytes(body), CONTENT_TYPE_TASK_EVENT)
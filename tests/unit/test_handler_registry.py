@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import pytest
+from uuid import uuid4
+
+from src.infra.mq.envelope import TASK_TYPE_HEADER, encode_message
+from src.infra.tasks.handler import BaseMessageHandler
+from src.infra.tasks.registry import HandlerRegistry, TaskTypeSaturated, TokenBucket, TypePolicy, complete_task
+from src.models.tasks import Status
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_per_type():
+    registry = HandlerRegistry()
+    peak = {"slow": 0, "fast": 0}
+    running = {"slow": 0, "fast": 0}
+
+    async def job(task_type: str):
+        async with registry.admit(task_type):
+            running[task_type] += 1
+            peak[task_type] = max(peak[task_type], running[task_type])
+            await asyncio.sleep(0.01)
+            running[task_type] -= 1
+
+    registry.register("slow", lambda task_id, payload: asyncio.sleep(0), TypePolicy(concurrency=2, max_waiting=10))
+    registry.register("fast", lambda task_id, payload: asyncio.sleep(0), TypePolicy(concurrency=8))
+    await asyncio.gather(*(job("slow") for _ in range(10)), *(job("fast") for _ in range(8)))
+
+    assert peak == {"slow": 2, "fast": 8}
+
+
+@pytest.mark.asyncio
+async def test_overflowing_type_is_deferred():
+    registry = HandlerRegistry()
+    registry.register("slow", lambda task_id, payload: asyncio.sleep(0), TypePolicy(concurrency=1, max_waiting=1))
+    release = asyncio.Event()
+
+    async def hold():
+        async with registry.admit("slow"):
+            await release.wait()
+
+    holders = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(TaskTypeSaturated):
+        async with registry.admit("slow"):
+            pass
+    release.set()
+    await asyncio.gather(*holders)
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_unknown_type_fallback():
+    registry = HandlerRegistry()
+    registry.register("stuck", lambda task_id, payload: asyncio.sleep(1), TypePolicy(timeout=0.01))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await registry.run("stuck", uuid4(), {})
+    await registry.run("unknown", uuid4(), {})
+    assert registry.resolve("unknown") is registry.resolve(None)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+    assert await bucket.acquire() < 0.001
+    assert await bucket.acquire() > 0.005
+    assert await TokenBucket(rate=0).acquire() == 0
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_task_type_travels_in_header(fmt):
+    payload = {"task_id": str(uuid4()), "payload": {"priority": "HIGH", "type": "report"}}
+    _, _, headers = encode_message(payload, "task.created", fmt)
+    assert headers[TASK_TYPE_HEADER] == "report"
+
+
+def test_waiting_is_bounded_by_default():
+    registry = HandlerRegistry()
+    registry.register("report", complete_task, TypePolicy(concurrency=3))
+    assert registry.resolve("report").max_waiting == 3
+
+
+@pytest.mark.parametrize("event_type, rejected, runs", [
+    ("task.created", False, True),
+    ("task.created", True, True),
+    ("task.deleted", False, False),
+])
+@pytest.mark.asyncio
+async def test_handler_dispatches_only_created_events(event_type, rejected, runs, fake_task_service, caplog):
+    caplog.set_level(logging.INFO)
+    registry = HandlerRegistry()
+    calls = []
+
+    async def report(task_id, payload):
+        calls.append(task_id)
+
+    registry.register("report", report)
+    # rejected: задачу отменили, пока сообщение ждало, и guarded UPDATE не переводит ее в COMPLETED.
+    service = fake_task_service(rejected=rejected)
+    handler = BaseMessageHandler(logging.getLogger("test"), service, registry=registry)
+
+    await handler.handle({"task_id": str(uuid4()), "event_type": event_type}, "report")
+
+    assert bool(calls) is runs
+    assert service.updates == ([Status.COMPLETED] if runs else [])
+    assert ("rejected, skipping" in caplog.text) is rejected
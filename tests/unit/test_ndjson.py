@@ -0,0 +1,25 @@
+import pytest
+
+from src.core.ndjson import iter_lines, dumps_line
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_lines_split_across_chunks():
+    lines = [item async for item in iter_lines(_chunks(b'{"a":', b'1}\n\n{"b"', b':2}\n{"c":3}'))]
+
+    assert lines == [(1, b'{"a":1}'), (3, b'{"b":2}'), (4, b'{"c":3}')]
+
+
+@pytest.mark.asyncio
+async def test_too_long_line_raises():
+    with pytest.raises(ValueError):
+        [item async for item in iter_lines(_chunks(b"x" * 10, b"y" * 10), max_line_bytes=15)]
+
+
+def test_dumps_line_is_single_line():
+    assert dumps_line({"title": "a\nb"}) == b'{"title":"a\\nb"}\n'
@@ -0,0 +1,47 @@
+import pytest
+from uuid import uuid4
+
+from src.infra.notifications.hub import TaskNotificationHub, parse_status_payload, waiters_gauge
+from src.models.tasks import Status
+
+
+@pytest.mark.asyncio
+async def test_watch_wakes_only_on_terminal_status():
+    hub = TaskNotificationHub()
+    task_id = uuid4()
+
+    with hub.watch(task_id) as finished:
+        hub.publish(task_id, Status.IN_PROGRESS)
+        assert not finished.is_set()
+        hub.publish(task_id, Status.COMPLETED)
+        assert finished.is_set()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_drops_events_when_queue_full():
+    hub = TaskNotificationHub(queue_size=1)
+    first, second = uuid4(), uuid4()
+
+    with hub.subscribe() as queue:
+        hub.publish(first, Status.FAILED)
+        hub.publish(second, Status.COMPLETED)
+        assert queue.qsize() == 1
+        assert queue.get_nowait() == (first, Status.FAILED)
+
+
+@pytest.mark.asyncio
+async def test_waiter_gauge_is_a_running_count():
+    hub = TaskNotificationHub()
+    task_id = uuid4()
+
+    with hub.watch(task_id), hub.watch(task_id), hub.watch(uuid4()):
+        assert waiters_gauge.value == 3
+        hub.publish(task_id, Status.COMPLETED)
+        assert waiters_gauge.value == 1
+    assert waiters_gauge.value == 0
+
+
+def test_parse_status_payload():
+    task_id = uuid4()
+    assert parse_status_payload(f"{task_id}:COMPLETED") == (task_id, Status.COMPLETED)
+    assert parse_status_payload("garbage") is None
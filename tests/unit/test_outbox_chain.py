@@ -0,0 +1,38 @@
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.services.outbox_publisher import OutboxPublisher
+
+
+class FakePublisher:
+    def __init__(self, fail_on: set):
+        self.fail_on = fail_on
+        self.published = []
+
+    async def publish(self, message, routing_key, key=None):
+        if message.message_id in self.fail_on:
+            raise RuntimeError("nack")
+        self.published.append(message.message_id)
+
+
+def _row(aggregate_id):
+    return SimpleNamespace(
+        id=uuid4(),
+        aggregate_id=aggregate_id,
+        event_type="task.deleted",
+        payload={"task_id": str(aggregate_id)},
+    )
+
+
+@pytest.mark.asyncio
+async def test_chain_stops_at_first_failure():
+    aggregate = uuid4()
+    rows = [_row(aggregate) for _ in range(3)]
+    relay = OutboxPublisher()
+    relay.publisher = FakePublisher(fail_on={str(rows[1].id)})
+
+    confirmed = await relay._publish_chain(rows)
+
+    assert confirmed == [rows[0].id]
+    assert relay.publisher.published == [str(rows[0].id)]
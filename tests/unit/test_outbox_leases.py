@@ -0,0 +1,18 @@
+import pytest
+
+from src.services.outbox_leases import check_partition_index
+
+INDEXDEF = (
+    "CREATE INDEX ix_outbox_unsent_partition ON public.outbox USING btree "
+    "((((hashtext((aggregate_id)::text) & 2147483647) % 16)), created_at) WHERE (NOT sent)"
+)
+
+
+def test_matching_partition_index_passes():
+    check_partition_index(INDEXDEF, 16)
+
+
+@pytest.mark.parametrize("partitions, indexdef", [(32, INDEXDEF), (16, None)])
+def test_partition_index_mismatch_stops_relay(partitions, indexdef):
+    with pytest.raises(RuntimeError, match="OUTBOX_PARTITIONS"):
+        check_partition_index(indexdef, partitions)
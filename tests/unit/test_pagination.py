@@ -0,0 +1,18 @@
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from src.core.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 11, 26, 23, 37, 38, 645922, tzinfo=timezone.utc)
+    task_id = uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, task_id)) == (created_at, task_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm9waXBl"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
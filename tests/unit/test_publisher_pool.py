@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from uuid import uuid4
+
+from src.infra.mq.publisher import PublisherPool, backoff_delay
+
+
+class FakeExchange:
+    def __init__(self, broker):
+        self._broker = broker
+
+    async def publish(self, message, routing_key):
+        self._broker.in_flight += 1
+        self._broker.peak = max(self._broker.peak, self._broker.in_flight)
+        await asyncio.sleep(0.01)
+        self._broker.in_flight -= 1
+        if routing_key == "fail":
+            raise RuntimeError("nack")
+        self._broker.published.append(routing_key)
+
+
+class FakeChannel:
+    def __init__(self, broker):
+        self.is_closed = False
+        self.default_exchange = FakeExchange(broker)
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.published = []
+        self.channels = 0
+
+    async def channel(self, publisher_confirms=False):
+        assert publisher_confirms
+        self.channels += 1
+        return FakeChannel(self)
+
+
+@pytest.mark.asyncio
+async def test_publishes_are_pipelined_within_window():
+    connection = FakeConnection()
+
+    async def factory():
+        return connection
+
+    pool = PublisherPool(factory, size=2, window=3)
+    results = await pool.publish_many([(object(), "ok")] * 20 + [(object(), "fail")])
+
+    assert connection.channels == 2
+    assert connection.peak == 6
+    assert len(connection.published) == 20
+    assert results[:20] == [None] * 20
+    assert isinstance(results[20], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_same_key_stays_on_one_channel():
+    connection = FakeConnection()
+
+    async def factory():
+        return connection
+
+    pool = PublisherPool(factory, size=4, window=3)
+    aggregate = uuid4()
+    await pool.publish_many([(object(), "ok")] * 10, keys=[aggregate] * 10)
+
+    assert connection.channels == 1
+    assert len({pool._index(aggregate) for _ in range(5)}) == 1
+    assert {pool._index(None) for _ in range(4)} == {0, 1, 2, 3}
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = {backoff_delay(10, base=1.0, cap=5.0) for _ in range(50)}
+
+    assert all(0 <= delay <= 5.0 for delay in delays)
+    assert len(delays) > 1
@@ -0,0 +1,36 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from src.core.settings import Settings, settings
+from src.infra.mq.client import MessageQueueClientAsync
+
+
+def _message(routing_key: str, headers: dict | None = None):
+    return SimpleNamespace(
+        routing_key=routing_key, headers=headers, body=b"{}", content_type="application/json", message_id="m-1",
+    )
+
+
+@pytest.mark.parametrize("raw, expected", [("30", [30]), ("1000, 5000,30000", [1000, 5000, 30000])])
+def test_retry_delays_parsed_as_list(monkeypatch, raw, expected):
+    monkeypatch.setenv("RETRY_DELAYS_MS", raw)
+    assert Settings().RETRY_DELAYS_MS == expected
+
+
+@pytest.mark.asyncio
+async def test_retry_goes_to_delay_tier_of_origin_queue(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_DELAYS_MS", [1000, 5000])
+    client = MessageQueueClientAsync.get_instance()
+    exchange = SimpleNamespace(publish=AsyncMock())
+    monkeypatch.setattr(client, "_publisher", exchange)
+
+    await client.republish_to_retry(_message(settings.ROUTING_KEY_HIGH), attempt=1)
+    await client.republish_to_retry(_message("ignored", {"x-origin-queue": settings.QUEUE_LOW}), attempt=7)
+
+    first, second = exchange.publish.await_args_list
+    assert first.kwargs["routing_key"] == f"{settings.QUEUE_HIGH}.retry.1000"
+    assert first.args[0].headers["attempts"] == 1
+    assert first.args[0].message_id == "m-1"
+    assert second.kwargs["routing_key"] == f"{settings.QUEUE_LOW}.retry.5000"
+    assert second.args[0].headers["x-origin-queue"] == settings.QUEUE_LOW
@@ -0,0 +1,26 @@
+import asyncio
+import logging
+import pytest
+from uuid import uuid4
+
+from src.infra.tasks.status_writer import StatusBatchWriter
+from src.models.tasks import Status
+
+
+@pytest.mark.asyncio
+async def test_submits_are_grouped_into_batches(fake_task_service):
+    service = fake_task_service()
+    writer = StatusBatchWriter(service, logging.getLogger("test"), max_batch=10, max_delay_ms=5)
+
+    await asyncio.gather(*(writer.submit(uuid4(), Status.COMPLETED) for _ in range(25)))
+    await writer.close()
+
+    assert [len(call[Status.COMPLETED]) for call in service.calls] == [10, 10, 5]
+
+
+@pytest.mark.asyncio
+async def test_submit_fails_when_batch_is_not_committed(fake_task_service):
+    writer = StatusBatchWriter(fake_task_service(fail=True), logging.getLogger("test"), max_batch=10, max_delay_ms=1)
+
+    with pytest.raises(RuntimeError):
+        await writer.submit(uuid4(), Status.COMPLETED)
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from src.infra.cache.backends import LRUCache, InMemorySharedCache
+from src.infra.cache.task_cache import TaskCache
+from src.models.tasks import Priority, Status
+
+
+@pytest.mark.asyncio
+async def test_local_hit_after_set():
+    cache = TaskCache(LRUCache(10), InMemorySharedCache(10), local_ttl=5, shared_ttl=5)
+    task_id = uuid4()
+
+    assert await cache.get(task_id) is None
+    await cache.set(task_id, {"id": str(task_id), "status": "PENDING"})
+    assert (await cache.get(task_id))["status"] == "PENDING"
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_fills_other_process_cache():
+    shared = InMemorySharedCache(10)
+    writer = TaskCache(LRUCache(10), shared, local_ttl=5, shared_ttl=5)
+    reader = TaskCache(LRUCache(10), shared, local_ttl=5, shared_ttl=5)
+    task_id = uuid4()
+
+    await writer.set(task_id, {"status": "PENDING"})
+    assert await reader.get(task_id) == {"status": "PENDING"}
+
+    await writer.invalidate(task_id)
+    assert await writer.get(task_id) is None
+
+
+@pytest.mark.asyncio
+async def test_local_entries_expire():
+    cache = TaskCache(LRUCache(10), local_ttl=0.01)
+    task_id = uuid4()
+
+    await cache.set(task_id, {"status": "PENDING"})
+    await asyncio.sleep(0.02)
+    assert await cache.get(task_id) is None
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest():
+    lru = LRUCache(max_size=2)
+    await lru.set("a", 1, 10)
+    await lru.set("b", 2, 10)
+    await lru.get("a")
+    await lru.set("c", 3, 10)
+
+    assert await lru.get("b") is None
+    assert await lru.get("a") == 1
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+@pytest.mark.asyncio
+async def test_cache_is_filled_from_primary(task_service, use_cache):
+    task_id = uuid4()
+    task_service.task_repo.get_task_row.return_value = {
+        "id": task_id, "title": "t", "type": "default", "description": None, "priority": Priority.LOW,
+        "status": Status.PENDING, "created_at": datetime.now(timezone.utc), "started_at": None,
+        "finished_at": None, "result": None, "error": None,
+    }
+
+    await task_service.get_task(task_id, use_cache=use_cache)
+
+    assert await task_service.cache.get(task_id) is not None
+    # get_task_service всегда передает отдельный read_uow, даже без реплики.
+    assert task_service.read_uow is not task_service.uow
+    assert (task_service.uow.entered, task_service.read_uow.entered) == (1, 0)
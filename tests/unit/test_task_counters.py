@@ -0,0 +1,33 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from sqlalchemy.dialects import postgresql
+
+from src.models.task_counters import TaskCounter
+from src.models.tasks import Priority, Status
+from src.repositories.task_counter_repository import TaskCounterRepository
+
+
+def test_primary_key_matches_migration():
+    assert [column.name for column in TaskCounter.__mapper__.primary_key] == ["status", "priority", "shard"]
+    assert "id" not in TaskCounter.__table__.c
+
+
+@pytest.mark.asyncio
+async def test_apply_writes_one_shard_per_transaction():
+    db = AsyncMock()
+    repo = TaskCounterRepository(enabled=True, shards=4)
+
+    await repo.apply(db, {(Status.PENDING, Priority.HIGH): 1, (Status.NEW, Priority.HIGH): -1})
+
+    (stmt,), _ = db.execute.await_args
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    shards = {value for key, value in params.items() if key.startswith("shard")}
+    assert len(shards) == 1 and shards.pop() in range(4)
+
+
+@pytest.mark.asyncio
+async def test_disabled_counters_do_not_touch_db():
+    db = AsyncMock()
+    await TaskCounterRepository(enabled=False).apply(db, {(Status.PENDING, Priority.HIGH): 1})
+    db.execute.assert_not_awaited()
@@ -0,0 +1,38 @@
+import pytest
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.core.exceptions import UpdateTaskException
+from src.models.tasks import ALLOWED_TRANSITIONS, Status, TERMINAL_STATUSES
+
+
+def test_finished_tasks_cannot_change_status():
+    for new_status, allowed_from in ALLOWED_TRANSITIONS.items():
+        assert Status.COMPLETED not in allowed_from
+        assert Status.FAILED not in allowed_from
+        # Повторная отмена разрешена - удаление идемпотентно.
+        assert Status.CANCELLED not in allowed_from or new_status == Status.CANCELLED
+
+
+def test_new_is_not_a_target_and_every_terminal_status_is_reachable():
+    assert Status.NEW not in ALLOWED_TRANSITIONS
+    for status in TERMINAL_STATUSES:
+        assert Status.IN_PROGRESS in ALLOWED_TRANSITIONS[status] or status == Status.CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_rejected_transition_is_a_no_op(task_service):
+    task_service.task_repo.transition_status.return_value = None
+    task_service.task_repo.get_task.return_value = SimpleNamespace(status=Status.CANCELLED)
+
+    assert await task_service.update_task_status(uuid4(), Status.COMPLETED) is None
+    task_service.counter_repo.apply.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_missing_task_is_still_an_error(task_service):
+    task_service.task_repo.transition_status.return_value = None
+    task_service.task_repo.get_task.return_value = None
+
+    with pytest.raises(UpdateTaskException):
+        await task_service.update_task_status(uuid4(), Status.COMPLETED)
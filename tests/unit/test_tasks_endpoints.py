@@ -1,15 +1,23 @@
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 from uuid import uuid4
 from fastapi import status
 from httpx import AsyncClient
 
+from main import app
+from src.core import codec
+from src.dependencies.service import get_task_service
+from src.infra.notifications.hub import TaskNotificationHub, get_notification_hub
+from src.models.tasks import Status
+
 
 @pytest.fixture
-def fake_service(monkeypatch):
+def fake_service():
     svc = AsyncMock()
-    monkeypatch.setattr("app.api.v1.dependencies.get_task_service", lambda: svc)
-    return svc
+    app.dependency_overrides[get_task_service] = lambda: svc
+    yield svc
+    app.dependency_overrides.pop(get_task_service, None)
 
 
 @pytest.mark.asyncio
@@ -18,6 +26,7 @@ async def test_create_task_ok(async_client: AsyncClient, fake_service: AsyncMock
     fake_task = {
         "id": str(tid),
         "title": "test",
+        "type": "default",
         "description": "x",
         "priority": "MEDIUM",
         "status": "PENDING",
@@ -59,3 +68,72 @@ async def test_delete_task(async_client: AsyncClient, fake_service: AsyncMock):
     resp = await async_client.delete(f"/api/v1/tasks/{tid}")
     assert resp.status_code == 200
     assert resp.json() == {"deleted": True}
+
+
+def _ndjson(*rows: dict) -> bytes:
+    return b"".join(codec.dumps(row) + b"\n" for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_exported_columns(async_client: AsyncClient, fake_service: AsyncMock):
+    fake_service.import_tasks.side_effect = lambda items: len(items)
+    tid = uuid4()
+    exported = {
+        "id": str(tid),
+        "title": "done",
+        "type": "report",
+        "description": None,
+        "priority": "HIGH",
+        "status": "COMPLETED",
+        "created_at": "2024-01-01T00:00:00Z",
+        "started_at": "2024-01-01T00:00:01Z",
+        "finished_at": "2024-01-01T00:00:02Z",
+        "result": "ok",
+        "error": None,
+    }
+
+    resp = await async_client.post("/api/v1/tasks/import", content=_ndjson(exported))
+
+    assert resp.status_code == 200
+    assert resp.json()["imported"] == 1
+    (items,), _ = fake_service.import_tasks.await_args
+    assert items[0].id == tid
+    assert items[0].status == Status.COMPLETED
+    assert items[0].result == "ok"
+    assert items[0].finished_at is not None
+    fake_service.create_tasks.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_import_accepts_lines_without_description(async_client: AsyncClient, fake_service: AsyncMock):
+    fake_service.import_tasks.side_effect = lambda items: len(items) - 1
+
+    resp = await async_client.post(
+        "/api/v1/tasks/import",
+        content=_ndjson({"request_id": "r-1", "title": "a", "body": "x"}, {"title": "b"}) + b"{broken\n",
+    )
+
+    body = resp.json()
+    assert resp.status_code == 200
+    assert (body["imported"], body["skipped"], body["failed"]) == (1, 1, 1)
+    assert body["errors"][0]["line"] == 3
+    (items,), _ = fake_service.import_tasks.await_args
+    assert [item.status for item in items] == [Status.PENDING, Status.PENDING]
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_rereads_from_primary(async_client: AsyncClient, fake_service: AsyncMock):
+    tid = uuid4()
+    completed = {"id": str(tid), "title": "t", "type": "default", "description": None, "priority": "MEDIUM",
+                 "status": "COMPLETED", "created_at": "2024-01-01T00:00:00Z", "started_at": None,
+                 "finished_at": None, "result": None, "error": None}
+    # Первое чтение (возможно, из кэша) еще видит PENDING, завершение пропущено.
+    fake_service.get_task.side_effect = [SimpleNamespace(status=Status.PENDING), completed]
+    app.dependency_overrides[get_notification_hub] = TaskNotificationHub
+    try:
+        resp = await async_client.get(f"/api/v1/tasks/{tid}/wait", params={"timeout": 0})
+    finally:
+        app.dependency_overrides.pop(get_notification_hub, None)
+
+    assert resp.json()["status"] == "COMPLETED"
+    assert fake_service.get_task.await_args.kwargs == {"use_cache": False}
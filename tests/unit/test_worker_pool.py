@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+
+from src.infra.tasks.limiter import ConcurrencyLimiter, split_capacity
+
+
+def test_split_capacity_by_weight():
+    capacity = split_capacity(10, {"high": 6, "medium": 3, "low": 1})
+    assert sum(capacity.values()) == 10
+    assert capacity["high"] > capacity["medium"] > capacity["low"] >= 1
+
+
+def test_split_capacity_gives_every_queue_a_slot():
+    capacity = split_capacity(2, {"high": 6, "medium": 3, "low": 1})
+    assert capacity == {"high": 1, "medium": 1, "low": 1}
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounds_in_flight():
+    limiter = ConcurrencyLimiter(2)
+    peak = 0
+
+    async def job():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(job() for _ in range(10)))
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_can_grow_at_runtime():
+    limiter = ConcurrencyLimiter(1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await limiter.set_limit(2)
+    await asyncio.wait_for(waiter, timeout=1)
+    assert limiter.in_flight == 2